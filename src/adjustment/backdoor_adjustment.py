@@ -1,13 +1,15 @@
-import itertools
 # from path.path_utils import causalPathExists
 
+import networkx as nx
+
 from src.graph.classes.graph import Graph
-from src.graph.classes.graph_defs import basicNodeType, latentNodeType, undirectedEdgeType
+from src.graph.classes.graph_defs import latentNodeType, undirectedEdgeType
 from src.adjustment.adjustment_sets_utils import writeNodeNames
 from src.inference.utils.graph_utils import compareNames
 
 from src.inference.utils.graph_utils import GraphUtils as gu
 from src.inference.utils.set_utils import SetUtils as su
+from src.inference.utils.pool_utils import PoolUtils as plu
 from src.projection.projection_utils import ProjectionUtils
 from src.path_analysis.d_separation import DSeparation
 from src.path_analysis.utils.path_utils import PathUtils
@@ -15,12 +17,8 @@ from src.common.object_utils import ObjectUtils as ou
 
 from src.error.error_messages import defaultErrorMessage
 from src.adjustment.classes.exceptions import AdjustmentSetsError
-from src.common.uuid_generator import UUIDGenerator as uuid
-
+from src.adjustment.classes.separator_context import SeparatorContext
 
-# IDs of nodes representing a single group of treatment/outcome
-global XmId
-global YmId
 
 errors = {
     'treatment': 'Please specify the treatment variable(s).',
@@ -40,6 +38,12 @@ class BackdoorAdjustment():
     -------
     listAdmissibleSets(graph, X, Y, Z = [], limit = 1e8)
         Returns a list of admissible sets.
+    iterAdmissibleSets(graph, X, Y, Z = [])
+        Yields the admissible sets one at a time.
+    listAdmissibleSetsForPairs(graph, pairs, Z = [], limit = 1e8, processes = None)
+        Returns the admissible sets of many treatment/outcome pairs, keyed by pair.
+    findMinimumAdjustment(graph, X, Y, weights = None, Z = [])
+        Returns an admissible set of minimum size or cost.
     testAdmissibility(graph, X, Y, Z = [], covariates = [])
         Tests whether a given list of covariates is admissible or not.
     """
@@ -72,178 +76,440 @@ class BackdoorAdjustment():
             An exception including an error message (and witness if any).
         """
 
-        global XmId
-        global YmId
-
         try:
-            if not graph or not X or not Y:
-                raise
+            return BackdoorAdjustment.minimumSets(BackdoorAdjustment.iterAdmissibleSets(graph, X, Y, Z), limit)
 
-            X = ou.makeArray(X)
-            Y = ou.makeArray(Y)
-            Z = ou.makeArray(Z)
+        except AdjustmentSetsError as error:
+            return {'error': error.__repr__()}
+        except:
+            return {'error': AdjustmentSetsError(defaultErrorMessage).__repr__()}
 
-            if len(X) == 0 and len(Y) == 0:
-                raise AdjustmentSetsError(errors['treatmentAndOutcome'])
-            elif len(X) == 0 and len(Y) != 0:
-                raise AdjustmentSetsError(errors['treatment'])
-            elif len(X) != 0 and len(Y) == 0:
-                raise AdjustmentSetsError(errors['outcome'])
+    #   keep the first limit admissible sets, then those of them of minimum size
 
-            G = ProjectionUtils.unproject(graph)
+    @staticmethod
+    def minimumSets(sets, limit=1e8):
+        admissibleSets = []
 
-            # if not causalPathExists(G, X, Y):
-            # return {'admissibleSets': []}
+        for nodeNames in sets:
+            if len(admissibleSets) >= limit:
+                break
 
-            Gpbd = gu.gpbd(G, X, Y)
-            AnG = gu.ancestral(Gpbd, X + Y + Z)
-            M = gu.moralize(AnG)
+            admissibleSets.append(nodeNames)
 
-            if len(M.nodes) == 0:
-                return []
+        #   remove sets which are not minimum-size
+        minSize = float('inf')
 
-            # change graph to make it suitable to run Takata's
+        for nodeNames in admissibleSets:
+            if len(nodeNames) < minSize:
+                minSize = len(nodeNames)
 
-            # add X_m and Y_m
-            # reset random Ids
-            XmId = uuid.generateRandomId(32)
-            YmId = uuid.generateRandomId(32)
+        sets = [v for v in admissibleSets if len(v) == minSize]
 
-            XmNode = {
-                'name': XmId,
-                'label': XmId
-            }
-            YmNode = {
-                'name': YmId,
-                'label': YmId
-            }
+        #   this sorts the sets by lex order, but not the labels within each set
+        #   sets are distinct already, separators are deduplicated as they are found
+        sets.sort()
 
-            M.addNodes([XmNode, YmNode])
+        return sets
 
-            #   add a node: X_m which connects all X
-            #   add a node: Y_m which connects all Y
-            edgesToAdd = []
+    # Graph, Node | Node[], Node | Node[], Node | Node[]
+    # (Node[], Node[], Node[])
 
-            for node in X:
-                edgesToAdd.append({
-                    'from_': XmId,
-                    'to_': node['name'],
-                    'type_': undirectedEdgeType.id_
-                })
+    @staticmethod
+    def validateQuery(graph, X, Y, Z=[]):
+        if not graph or not X or not Y:
+            raise AdjustmentSetsError(defaultErrorMessage)
 
-            for node in Y:
-                edgesToAdd.append({
-                    'from_': YmId,
-                    'to_': node['name'],
-                    'type_': undirectedEdgeType.id_
-                })
+        X = ou.makeArray(X)
+        Y = ou.makeArray(Y)
+        Z = ou.makeArray(Z)
+
+        if len(X) == 0 and len(Y) == 0:
+            raise AdjustmentSetsError(errors['treatmentAndOutcome'])
+        elif len(X) == 0 and len(Y) != 0:
+            raise AdjustmentSetsError(errors['treatment'])
+        elif len(X) != 0 and len(Y) == 0:
+            raise AdjustmentSetsError(errors['outcome'])
 
-            M.addEdges(edgesToAdd)
+        return (X, Y, Z)
 
-            #   connect X_m with N(X)
-            #   connect Y_m with N(Y)
-            NX = gu.neighbors(X, M)
-            NY = gu.neighbors(Y, M)
+    @staticmethod
+    def iterAdmissibleSets(graph, X, Y, Z=[]):
+        """
+        Yields the admissible sets one at a time, as sorted lists of node names, in the
+        order in which they are found. Separators are computed on demand, so stopping
+        early skips the rest of the enumeration.
 
-            #   exclude self nodes
-            NX = su.difference(NX, [XmNode], 'name')
-            NY = su.difference(NY, [YmNode], 'name')
+        Parameters
+        ----------
+        graph : Graph
+            A Graph object.
+        X : Node | List[Node]
+            A list of treatment variables.
+        Y : Node | List[Node]
+            A list of outcome variables.
+        Z : Node | List[Node]
+            A list of adjusted variables (default is empty).
 
-            edgesToAdd = []
+        Returns
+        -------
+        sets: Iterator[List[str]]
 
-            for node in NX:
-                edgesToAdd.append({
-                    'from_': XmId,
-                    'to_': node['name'],
-                    'type_': undirectedEdgeType.id_
-                })
+        Raises
+        ------
+        AdjustmentSetsError
+            An exception including an error message (and witness if any).
+        """
 
-            for node in NY:
-                edgesToAdd.append({
-                    'from_': YmId,
-                    'to_': node['name'],
-                    'type_': undirectedEdgeType.id_
-                })
+        (X, Y, Z) = BackdoorAdjustment.validateQuery(graph, X, Y, Z)
 
-            M.addEdges(edgesToAdd)
+        G = ProjectionUtils.unproject(graph)
 
-            # remove R and connect its neighbors
-            edgesToAdd = []
+        # if not causalPathExists(G, X, Y):
+        # return {'admissibleSets': []}
 
-            Dpcp = gu.Dpcp(G, X, Y)
-            R = su.union(su.union(X, Y, 'name'), Dpcp, 'name')
+        Gpbd = gu.gpbd(G, X, Y)
+        AnG = gu.ancestral(Gpbd, X + Y + Z)
+        M = gu.moralize(AnG)
 
-            for node in R:
-                ns = gu.neighbors(node, M)
-                ns = su.difference(ns, R, 'name')
+        yield from BackdoorAdjustment.iterSeparatingSets(G, M, X, Y, Z, gu.Dpcp(G, X, Y))
 
-                names = list(map(lambda n: n['name'], ns))
-                pairs = [(a, b) for a in names for b in names if b > a]
+    #   admissible sets of a moralized ancestral proper back-door graph M of the
+    #   unprojected graph G, given the proper causal descendants Dpcp of X
 
-                for (a, b) in pairs:
-                    if gu.hasEdge(a, b, M) or gu.hasEdge(b, a, M):
-                        continue
+    @staticmethod
+    def iterSeparatingSets(G, M, X, Y, Z, Dpcp):
+        if len(M.nodes) == 0:
+            return
 
-                    edge = {
-                        'from_': a,
-                        'to_': b,
-                        'type_': undirectedEdgeType.id_
-                    }
+        # change graph to make it suitable to run Takata's
+
+        # add X_m and Y_m
+        # with random Ids, kept in a context of their own for this call
+        context = SeparatorContext()
+        XmNode = context.source
+        YmNode = context.target
+        XmId = XmNode['name']
+        YmId = YmNode['name']
+
+        M.addNodes([XmNode, YmNode])
+
+        #   add a node: X_m which connects all X
+        #   add a node: Y_m which connects all Y
+        edgesToAdd = []
+
+        for node in X:
+            edgesToAdd.append({
+                'from_': XmId,
+                'to_': node['name'],
+                'type_': undirectedEdgeType.id_
+            })
+
+        for node in Y:
+            edgesToAdd.append({
+                'from_': YmId,
+                'to_': node['name'],
+                'type_': undirectedEdgeType.id_
+            })
+
+        M.addEdges(edgesToAdd)
+
+        #   connect X_m with N(X)
+        #   connect Y_m with N(Y)
+        NX = gu.neighbors(X, M)
+        NY = gu.neighbors(Y, M)
+
+        #   exclude self nodes
+        NX = su.difference(NX, [XmNode], 'name')
+        NY = su.difference(NY, [YmNode], 'name')
+
+        edgesToAdd = []
+
+        for node in NX:
+            edgesToAdd.append({
+                'from_': XmId,
+                'to_': node['name'],
+                'type_': undirectedEdgeType.id_
+            })
+
+        for node in NY:
+            edgesToAdd.append({
+                'from_': YmId,
+                'to_': node['name'],
+                'type_': undirectedEdgeType.id_
+            })
+
+        M.addEdges(edgesToAdd)
+
+        # remove R and connect its neighbors
+        # a path may go through several nodes of R in a row, so the neighbors of every
+        # connected group of nodes of R are connected together
+        edgesToAdd = []
+
+        R = su.union(su.union(X, Y, 'name'), Dpcp, 'name')
+        R = su.intersection(R, M.nodes, 'name')
+        RNames = gu.nodeToNameMap(R)
+        visited = dict()
 
-                    edgesToAdd.append(edge)
+        for node in R:
+            if node['name'] in visited:
+                continue
 
-            M.addEdges(edgesToAdd)
-            M.deleteNodes(R)
+            visited[node['name']] = True
+            stack = [node]
+            names = []
 
-            A = [XmNode]
-            U = gu.neighbors(YmNode, M)
-            U.append(YmNode)
+            while len(stack) > 0:
+                current = stack.pop()
 
-            latentNodes = list(
-                filter(lambda n: n['type_'] == latentNodeType.id_, G.nodes))
-            nodesToExclude = su.union(latentNodes, [YmNode], 'name')
+                for neighbor in gu.neighbors(current, M):
+                    if neighbor['name'] not in RNames:
+                        if neighbor['name'] not in names:
+                            names.append(neighbor['name'])
+                    elif neighbor['name'] not in visited:
+                        visited[neighbor['name']] = True
+                        stack.append(neighbor)
 
-            #   find admissible sets
-            minimalSeparators = []
-            BackdoorAdjustment.listMinSep(
-                M, A, U, minimalSeparators, Z, nodesToExclude, limit)
+            pairs = [(a, b) for a in names for b in names if b > a]
 
-            admissibleSets = []
+            for (a, b) in pairs:
+                if gu.hasEdge(a, b, M) or gu.hasEdge(b, a, M):
+                    continue
 
-            #   remove sets including latent nodes
-            for nodes in minimalSeparators:
-                intersection = su.intersection(nodes, latentNodes, 'name')
+                edge = {
+                    'from_': a,
+                    'to_': b,
+                    'type_': undirectedEdgeType.id_
+                }
 
-                if len(intersection) == 0:
-                    admissibleSets.append(nodes)
+                edgesToAdd.append(edge)
 
-            #   remove sets which are not minimum-size
-            minSize = float('inf')
+        M.addEdges(edgesToAdd)
+        M.deleteNodes(R)
 
-            for nodes in admissibleSets:
-                if len(nodes) < minSize:
-                    minSize = len(nodes)
+        A = [XmNode]
+        U = gu.neighbors(YmNode, M)
+        U.append(YmNode)
 
-            admissibleSets = [v for v in admissibleSets if len(v) == minSize]
+        latentNodes = list(
+            filter(lambda n: n['type_'] == latentNodeType.id_, G.nodes))
+        nodesToExclude = su.union(latentNodes, [YmNode], 'name')
 
-            #   convert nodes to node names
-            sets = []
+        #   find admissible sets, i.e., minimal separators without latent nodes
+        for nodes in BackdoorAdjustment.iterMinSep(M, context, A, U, Z, nodesToExclude):
+            intersection = su.intersection(nodes, latentNodes, 'name')
 
-            for nodes in admissibleSets:
+            if len(intersection) == 0:
                 nodeNames = list(map(lambda n: n['name'], nodes))
                 nodeNames.sort()
 
-                sets.append(nodeNames)
+                yield nodeNames
+
+    @staticmethod
+    def listAdmissibleSetsForPairs(graph, pairs, Z=[], limit=1e8, processes=None):
+        """
+        Returns the admissible sets of many treatment/outcome pairs of the same graph.
+        The graph is unprojected once and its ancestor closures are shared by all the
+        pairs; each pair then only moralizes its own ancestral set.
+
+        Parameters
+        ----------
+        graph : Graph
+            A Graph object.
+        pairs : List[(Node | List[Node], Node | List[Node])]
+            A list of (treatment, outcome) pairs.
+        Z : Node | List[Node]
+            A list of adjusted variables shared by all the pairs (default is empty).
+        limit: number
+            Number of admissible sets to output for each pair before the algorithm stops (default is 1e8).
+        processes: number
+            Number of processes the pairs are split across (default is None, i.e., no pool).
+
+        Returns
+        -------
+        sets: Dict[(str | Tuple[str], str | Tuple[str]), List[List[str]]]
+            The result of listAdmissibleSets for each pair, keyed by the names of its treatment
+            and outcome (a tuple of names for a list of several nodes).
+        """
+
+        pairs = list(pairs)
+        keys = list(map(lambda pair: BackdoorAdjustment.pairKey(pair[0], pair[1]), pairs))
+        G = ProjectionUtils.unproject(graph) if graph else None
+
+        chunks = plu.mapChunks(BackdoorAdjustment.listPairs, pairs, processes, (G,), (Z, limit))
+        results = [result for chunk in chunks for result in chunk]
+
+        return dict(zip(keys, results))
+
+    # Graph, (Node | Node[], Node | Node[])[], Node[], number
+    # (List[List[str]] | Dict[str, str])[]
+
+    @staticmethod
+    def listPairs(G, pairs, Z=[], limit=1e8):
+        results = []
+
+        for (X, Y) in pairs:
+            try:
+                sets = BackdoorAdjustment.iterAdmissibleSetsOfPair(G, X, Y, Z)
+                results.append(BackdoorAdjustment.minimumSets(sets, limit))
+            except AdjustmentSetsError as error:
+                results.append({'error': error.__repr__()})
+            except:
+                results.append({'error': AdjustmentSetsError(defaultErrorMessage).__repr__()})
+
+        return results
+
+    #   same as iterAdmissibleSets, on a graph that is unprojected already and shared
+    #   with other pairs: nothing is copied but the moralized ancestral set of the pair
+
+    @staticmethod
+    def iterAdmissibleSetsOfPair(G, X, Y, Z=[]):
+        (X, Y, Z) = BackdoorAdjustment.validateQuery(G, X, Y, Z)
+
+        xNames = gu.nodeToNameMap(X)
+        yNames = gu.nodeToNameMap(Y)
+        DpcpNames = BackdoorAdjustment.properCausalDescendantNames(G, xNames, yNames)
+
+        #   the proper back-door graph hides the first edge of every proper causal path;
+        #   those edges leave X, so the ancestors of X, Y and Z are the same with or without them
+        hiddenEdges = []
+
+        for x in xNames:
+            for child in G.childNames(x):
+                if child in DpcpNames or child in yNames:
+                    hiddenEdges.append((x, child))
+
+        An = G.ancestorNames(list(xNames) + list(yNames) + list(map(lambda n: n['name'], Z)))
+        M = gu.moralize(G.view(An, hiddenEdges))
+
+        yield from BackdoorAdjustment.iterSeparatingSets(G, M, X, Y, Z, G.nodesFromNames(DpcpNames))
+
+    #   names of the descendants of the nodes on proper causal paths from X to Y, i.e.,
+    #   of the descendants of X (but X) that are ancestors of Y without going through X
+
+    @staticmethod
+    def properCausalDescendantNames(G, xNames, yNames):
+        De = G.descendantNames(xNames)
+        hiddenEdges = [(x, child) for x in xNames for child in G.childNames(x)]
+        An = G.view(None, hiddenEdges).ancestorNames(yNames)
+        pcp = [name for name in De if name in An and name not in xNames]
+
+        return G.descendantNames(pcp)
+
+    # Node | Node[], Node | Node[]
+    # (str | Tuple[str], str | Tuple[str])
+
+    @staticmethod
+    def pairKey(X, Y):
+        def key(nodes):
+            names = tuple(map(lambda n: n['name'], ou.makeArray(nodes)))
+
+            return names[0] if len(names) == 1 else names
+
+        return (key(X), key(Y))
+
+    @staticmethod
+    def findMinimumAdjustment(graph, X, Y, weights=None, Z=[]):
+        """
+        Returns an admissible set of minimum size, or of minimum total weight when
+        weights are given, without enumerating the minimal separators. The set is a
+        minimum vertex cut between X and Y in the moralized ancestral proper
+        back-door graph, found by max-flow.
+
+        Parameters
+        ----------
+        graph : Graph
+            A Graph object.
+        X : Node | List[Node]
+            A list of treatment variables.
+        Y : Node | List[Node]
+            A list of outcome variables.
+        weights : Dict[str, number]
+            The cost of measuring each covariate, by node name (default is 1 for every node).
+            Nodes with an infinite cost are never chosen.
+        Z : Node | List[Node]
+            A list of adjusted variables (default is empty).
+
+        Returns
+        -------
+        set: List[str]
+            The sorted names of the covariates, or None if no admissible set exists.
+
+        Raises
+        ------
+        AdjustmentSetsError
+            An exception including an error message (and witness if any).
+        """
+
+        try:
+            (X, Y, Z) = BackdoorAdjustment.validateQuery(graph, X, Y, Z)
+
+            weights = weights if weights is not None else dict()
+
+            G = ProjectionUtils.unproject(graph)
+            Gpbd = gu.gpbd(G, X, Y)
+            AnG = gu.ancestral(Gpbd, X + Y + Z)
+            M = gu.moralize(AnG)
+
+            #   adjusted variables block every path through them, so they leave the graph;
+            #   treatments, outcomes, their proper causal descendants and latent nodes
+            #   cannot be adjusted for, so they keep an infinite capacity
+            Dpcp = gu.Dpcp(G, X, Y)
+            blocked = gu.nodeToNameMap(Z)
+            fixed = gu.nodeToNameMap(su.union(su.union(X, Y, 'name'), Dpcp, 'name'))
+
+            for node in G.nodes:
+                if node['type_'] == latentNodeType.id_:
+                    fixed[node['name']] = True
+
+            #   split every node v into (v, 'in') -> (v, 'out'), whose capacity is the cost
+            #   of v; edges without a capacity are infinite
+            F = nx.DiGraph()
+            source = ('source', None)
+            sink = ('sink', None)
+
+            for node in M.nodes:
+                name = node['name']
+
+                if name in blocked:
+                    continue
+
+                if name in fixed:
+                    F.add_edge((name, 'in'), (name, 'out'))
+                else:
+                    F.add_edge((name, 'in'), (name, 'out'), capacity=weights.get(name, 1))
+
+            for edge in M.edges:
+                (a, b) = (edge['from_'], edge['to_'])
+
+                if a in blocked or b in blocked:
+                    continue
 
-            #   this sorts the sets by lex order, but not the labels within each set
-            sets.sort()
+                F.add_edge((a, 'out'), (b, 'in'))
+                F.add_edge((b, 'out'), (a, 'in'))
 
-            #   remove duplicate sets
-            #   need to sort before
-            #   https://stackoverflow.com/questions/2213923/removing-duplicates-from-a-list-of-lists
-            sets = list(k for k, _ in itertools.groupby(sets))
+            for node in X:
+                if node['name'] not in blocked:
+                    F.add_edge(source, (node['name'], 'in'))
+
+            for node in Y:
+                if node['name'] not in blocked:
+                    F.add_edge((node['name'], 'out'), sink)
+
+            if source not in F or sink not in F:
+                return []
 
-            return sets
+            try:
+                (cost, (reachable, _)) = nx.minimum_cut(F, source, sink)
+            except nx.NetworkXUnbounded:
+                return None
+
+            if cost == float('inf'):
+                return None
+
+            nodeNames = [v[0] for v in reachable if v[1] == 'in' and (v[0], 'out') not in reachable]
+            nodeNames.sort()
+
+            return nodeNames
 
         except AdjustmentSetsError as error:
             return {'error': error.__repr__()}
@@ -251,32 +517,56 @@ class BackdoorAdjustment():
             return {'error': AdjustmentSetsError(defaultErrorMessage).__repr__()}
 
     @staticmethod
-    def listMinSep(G, A, U, minimalSeparators, Z=[], nodesToExclude=[], limit=1e8):
-        if len(minimalSeparators) >= limit:
-            return
+    def listMinSep(G, context, A, U, minimalSeparators, Z=[], nodesToExclude=[], limit=1e8):
+        for SA in BackdoorAdjustment.iterMinSep(G, context, A, U, Z, nodesToExclude):
+            if len(minimalSeparators) >= limit:
+                return
+
+            minimalSeparators.append(SA)
 
-        SA = BackdoorAdjustment.closeSeparator(G, A, Z, nodesToExclude)
-        Aexp = BackdoorAdjustment.expansion(G, SA, Z)
-        AexpIntersectU = su.intersection(Aexp, U, 'name')
+    #   enumerate the minimal separators close to A (Takata's algorithm)
+    #   - every node of the search tree either yields a separator or branches
+    #     on a single node v, which goes to A in one branch and to U in the other
+    #   - the two branches never share a separator, so the work between two
+    #     consecutive separators is polynomial
+    #   - separators are still deduplicated, since the nodes to exclude are
+    #     looked through rather than branched on
+
+    @staticmethod
+    def iterMinSep(G, context, A, U, Z=[], nodesToExclude=[]):
+        found = set()
+        stack = [(A, U)]
+
+        while len(stack) > 0:
+            (A, U) = stack.pop()
+
+            SA = BackdoorAdjustment.closeSeparator(G, context, A, Z, nodesToExclude)
+            Aexp = BackdoorAdjustment.expansion(G, context, SA, Z)
+            AexpIntersectU = su.intersection(Aexp, U, 'name')
+
+            #   subtree contains no new admissible sets
+            if len(AexpIntersectU) > 0:
+                continue
 
-        #   subtree contains new admissible sets
-        if len(AexpIntersectU) == 0:
             A = Aexp
             NA = BackdoorAdjustment.actualNeighbors(G, A, Z, nodesToExclude)
             NAMinusU = su.difference(NA, U, 'name')
 
             if len(NAMinusU) > 0:
-                for v in NAMinusU:
-                    BackdoorAdjustment.listMinSep(G, su.union(
-                        A, [v], 'name'), U, minimalSeparators, Z, nodesToExclude, limit)
-                    BackdoorAdjustment.listMinSep(G, A, su.union(
-                        U, [v], 'name'), minimalSeparators, Z, nodesToExclude, limit)
+                v = NAMinusU[0]
+
+                stack.append((A, su.union(U, [v], 'name')))
+                stack.append((su.union(A, [v], 'name'), U))
 
             #   leaf: output S(A) - minimal sepset
             else:
-                SA = BackdoorAdjustment.closeSeparator(G, A, Z, nodesToExclude)
+                SA = BackdoorAdjustment.closeSeparator(G, context, A, Z, nodesToExclude)
+                key = frozenset(map(lambda n: n['name'], SA))
+
+                if key not in found:
+                    found.add(key)
 
-                minimalSeparators.append(SA)
+                    yield SA
 
     #   find close separator of A
     #   - G' = G - N(A)
@@ -284,13 +574,8 @@ class BackdoorAdjustment():
     #   - Return N(V(C))
 
     @staticmethod
-    def closeSeparator(G, A, nodesToInclude=[], nodesToExclude=[]):
-        global YmId
-
-        YmNode = {
-            'name': YmId,
-            'type_': basicNodeType.id_
-        }
+    def closeSeparator(G, context, A, nodesToInclude=[], nodesToExclude=[]):
+        YmNode = context.target
 
         NA = BackdoorAdjustment.actualNeighbors(
             G, A, nodesToInclude, nodesToExclude)
@@ -316,13 +601,8 @@ class BackdoorAdjustment():
     #   - Return V(C)
 
     @staticmethod
-    def expansion(G, SA, nodesToInclude=[]):
-        global XmId
-
-        XmNode = {
-            'name': XmId,
-            'type_': basicNodeType.id_
-        }
+    def expansion(G, context, SA, nodesToInclude=[]):
+        XmNode = context.source
 
         VMinusSA = su.difference(G.nodes, su.union(
             SA, nodesToInclude, 'name'), 'name')
@@ -496,3 +776,4 @@ class BackdoorAdjustment():
             result[1]['witness'] = (G, condition2Paths, adjusted)
 
         return result
+
@@ -0,0 +1,56 @@
+from src.path_analysis.d_separation import DSeparation
+
+from src.common.object_utils import ObjectUtils as ou
+
+
+class SeparationOracle():
+    """
+    Memoized d-separation tests against a fixed graph, for the enumerators that branch
+    on (I, R) and keep asking the same questions. Answers are kept per frozen sets of
+    node names, both for existsSep(X, Y, I, R) and for the underlying tests (X, Y, Z),
+    so that different (I, R) leading to the same separating set share a single test.
+    The oracle works on its own copy of the graph: the ancestors of a view (e.g., the
+    G_bar_X of the ST enumerator) are searched anew on every call, while a copy caches
+    their closure once. Later changes to the graph passed in are not seen by the oracle.
+    """
+
+    # Graph
+    def __init__(self, G):
+        self.G = G.copy()
+        self.separations = dict()
+        self.tests = dict()
+
+
+    # Node[], Node[], Node[], Node[]
+    # boolean
+    def existsSep(self, X, Y, I, R):
+        # X and Y are separable by a set Z with I <= Z <= R iff they are separated by the nodes
+        # of R among the ancestors of X, Y and I (FindSep / TestSep)
+        key = (SeparationOracle.key(X), SeparationOracle.key(Y), SeparationOracle.key(I), SeparationOracle.key(R))
+
+        if key not in self.separations:
+            XYI = key[0] | key[1] | key[2]
+            AnXYI = self.G.ancestorNames(XYI)
+            Zprime = list(filter(lambda n: n['name'] in AnXYI or n['name'] in XYI, ou.makeArray(R)))
+
+            self.separations[key] = self.test(X, Y, Zprime)
+
+        return self.separations[key]
+
+
+    # Node | Node[], Node | Node[], Node | Node[]
+    # boolean
+    def test(self, X, Y, Z = []):
+        key = (SeparationOracle.key(X), SeparationOracle.key(Y), SeparationOracle.key(Z))
+
+        if key not in self.tests:
+            self.tests[key] = DSeparation.test(self.G, X, Y, Z)
+
+        return self.tests[key]
+
+
+    # Node | Node[]
+    # frozenset[str]
+    @staticmethod
+    def key(nodes):
+        return frozenset(map(lambda n: n['name'], filter(lambda n: n is not None, ou.makeArray(nodes))))
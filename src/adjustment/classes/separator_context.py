@@ -0,0 +1,25 @@
+from src.graph.classes.graph_defs import basicNodeType
+from src.common.uuid_generator import UUIDGenerator as uuid
+
+
+class SeparatorContext():
+    """
+    State of a single enumeration of minimal separators: the auxiliary node that stands
+    for the group of treatments (source) and the one that stands for the group of outcomes
+    (target). Each call builds its own context, so enumerations can run concurrently.
+    """
+
+    def __init__(self, sourceId = None, targetId = None):
+        sourceId = sourceId if sourceId is not None else uuid.generateRandomId(32)
+        targetId = targetId if targetId is not None else uuid.generateRandomId(32)
+
+        self.source = {
+            'name': sourceId,
+            'label': sourceId,
+            'type_': basicNodeType.id_
+        }
+        self.target = {
+            'name': targetId,
+            'label': targetId,
+            'type_': basicNodeType.id_
+        }
@@ -10,6 +10,7 @@ from src.path_analysis.d_separation import DSeparation
 
 from src.error.error_messages import defaultErrorMessage
 from src.adjustment.classes.exceptions import AdjustmentSetsError
+from src.adjustment.classes.separation_oracle import SeparationOracle
 
 errors = {
     'treatment': 'Please specify the treatment variable(s).',
@@ -102,29 +103,36 @@ class GeneralizedAdjustment():
             return {'error': AdjustmentSetsError(defaultErrorMessage).__repr__()}
 
     @staticmethod
-    def listSepAB(G, X, Y, S, I, R, T, admissibleSets, limit=1e8):
+    def listSepAB(G, X, Y, S, I, R, T, admissibleSets, limit=1e8, oracle=None):
         if len(admissibleSets) >= limit:
             return
 
-        if GeneralizedAdjustment.existsSep(G, X, Y, I, R) and GeneralizedAdjustment.existsSep(G, [S], Y, [], su.intersection(R, T, 'name')):
+        #   branches keep asking the same separation questions, so their answers are shared
+        if oracle is None:
+            oracle = SeparationOracle(G)
+
+        if GeneralizedAdjustment.existsSep(G, X, Y, I, R, oracle) and GeneralizedAdjustment.existsSep(G, [S], Y, [], su.intersection(R, T, 'name'), oracle):
             if su.equals(I, R, 'name'):
                 GeneralizedAdjustment.listSepC(G, S, Y, [], su.intersection(
-                    I, T, 'name'), su.difference(I, [S], 'name'), admissibleSets, limit)
+                    I, T, 'name'), su.difference(I, [S], 'name'), admissibleSets, limit, oracle)
             else:
                 RminusI = su.difference(R, I, 'name')
                 v = RminusI[0]
 
                 GeneralizedAdjustment.listSepAB(G, X, Y, S, su.union(
-                    I, [v], 'name'), R, T, admissibleSets, limit)
+                    I, [v], 'name'), R, T, admissibleSets, limit, oracle)
                 GeneralizedAdjustment.listSepAB(G, X, Y, S, I, su.difference(
-                    R, [v], 'name'), T, admissibleSets, limit)
+                    R, [v], 'name'), T, admissibleSets, limit, oracle)
 
     @staticmethod
-    def listSepC(G, S, Y, I, R, Z, admissibleSets, limit=1e8):
+    def listSepC(G, S, Y, I, R, Z, admissibleSets, limit=1e8, oracle=None):
         if len(admissibleSets) >= limit:
             return
 
-        if GeneralizedAdjustment.existsSep(G, [S], Y, I, R):
+        if oracle is None:
+            oracle = SeparationOracle(G)
+
+        if GeneralizedAdjustment.existsSep(G, [S], Y, I, R, oracle):
             if su.equals(I, R, 'name'):
                 sortedZ = sorted(Z, key=lambda n: n['name'])
                 sortedI = sorted(I, key=lambda n: n['name'])
@@ -136,18 +144,16 @@ class GeneralizedAdjustment():
                 v = RminusI[0]
 
                 GeneralizedAdjustment.listSepC(G, S, Y, su.union(
-                    I, [v], 'name'), R, Z, admissibleSets, limit)
+                    I, [v], 'name'), R, Z, admissibleSets, limit, oracle)
                 GeneralizedAdjustment.listSepC(G, S, Y, I, su.difference(
-                    R, [v], 'name'), Z, admissibleSets, limit)
+                    R, [v], 'name'), Z, admissibleSets, limit, oracle)
 
     @staticmethod
-    def existsSep(G, X, Y, I, R):
-        XYI = su.union(su.union(X, Y, 'name'), I, 'name')
-        AnXYI = gu.ancestors(XYI, G)
-        AnXYI = su.union(AnXYI, XYI, 'name')
-        Zprime = su.intersection(AnXYI, R, 'name')
+    def existsSep(G, X, Y, I, R, oracle=None):
+        if oracle is None:
+            oracle = SeparationOracle(G)
 
-        return DSeparation.test(G, X, Y, Zprime)
+        return oracle.existsSep(X, Y, I, R)
 
     @staticmethod
     def printAdmissibleSets(result):
@@ -13,6 +13,7 @@ from src.path_analysis.d_separation import DSeparation
 
 from src.error.error_messages import defaultErrorMessage
 from src.adjustment.classes.exceptions import AdjustmentSetsError
+from src.adjustment.classes.separation_oracle import SeparationOracle
 
 errors = {
     'treatment': 'Please specify the treatment variable(s).',
@@ -94,13 +95,17 @@ class STAdjustment():
             return {'error': AdjustmentSetsError(defaultErrorMessage).__repr__()}
 
     @staticmethod
-    def listGAdjIR(G, X, Y, T, S, I, R, admissibleSets, limit=1e8):
+    def listGAdjIR(G, X, Y, T, S, I, R, admissibleSets, limit=1e8, oracle=None):
         if len(admissibleSets) >= limit:
             return
 
-        GbarX = gu.transform(G, X, None)
+        #   every branch tests separation in the same G_bar_X, so the oracle on it is shared
+        if oracle is None:
+            oracle = SeparationOracle(gu.transform(G, X, None))
+
+        GbarX = oracle.G
 
-        if STAdjustment.existsSep(GbarX, su.union(T, [S] if S is not None else [], 'name'), Y, I, R):
+        if STAdjustment.existsSep(GbarX, su.union(T, [S] if S is not None else [], 'name'), Y, I, R, oracle):
             if su.equals(I, R, 'name'):
                 sortedI = sorted(I, key=lambda n: n['name'])
 
@@ -117,7 +122,7 @@ class STAdjustment():
 
                 if A is None:
                     for node in RminusI:
-                        if DSeparation.test(GbarX, node, Y, su.union(I, X, 'name')):
+                        if oracle.test(node, Y, su.union(I, X, 'name')):
                             A = node
                             break
 
@@ -129,12 +134,12 @@ class STAdjustment():
 
                 if A is not None:
                     STAdjustment.listGAdjIR(G, X, Y, T, S, su.union(
-                        I, [A], 'name'), R, admissibleSets, limit)
+                        I, [A], 'name'), R, admissibleSets, limit, oracle)
                     STAdjustment.listGAdjIR(G, X, Y, T, S, I, su.difference(
-                        R, [A], 'name'), admissibleSets, limit)
+                        R, [A], 'name'), admissibleSets, limit, oracle)
                 else:
                     STAdjustment.listGAdjIR(
-                        G, X, Y, T, S, I, I, admissibleSets, limit)
+                        G, X, Y, T, S, I, I, admissibleSets, limit, oracle)
 
     @staticmethod
     def isEAdmissible(G, X, Y, Z):
@@ -164,13 +169,11 @@ class STAdjustment():
         return False
 
     @staticmethod
-    def existsSep(G, X, Y, I, R):
-        XYI = su.union(su.union(X, Y, 'name'), I, 'name')
-        AnXYI = gu.ancestors(XYI, G)
-        AnXYI = su.union(AnXYI, XYI, 'name')
-        Zprime = su.intersection(AnXYI, R, 'name')
+    def existsSep(G, X, Y, I, R, oracle=None):
+        if oracle is None:
+            oracle = SeparationOracle(G)
 
-        return DSeparation.test(G, X, Y, Zprime)
+        return oracle.existsSep(X, Y, I, R)
 
     @staticmethod
     def printAdmissibleSets(result):
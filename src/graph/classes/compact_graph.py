@@ -0,0 +1,305 @@
+import numpy as np
+
+from src.graph.classes.graph_defs import directedEdgeType, bidirectedEdgeType, undirectedEdgeType, Direction
+
+
+class CompactGraph():
+    """
+    Array-backed snapshot of a Graph.
+
+    Node names are interned to integer ids (following the node order of the graph)
+    and every kind of adjacency is stored in CSR form, i.e., a pair of arrays
+    (indptr, indices) where the neighbors of node i are indices[indptr[i]:indptr[i + 1]].
+    Sets of nodes are represented as boolean masks over the ids.
+
+    The adjacencies mirror the typed indexes of Graph: parents and children for directed
+    edges, spouses for bidirected edges and, in others, one symmetric adjacency per other
+    edge type (e.g., undirected).
+    """
+
+    # Node[], Dict[str, (int[], int[])]
+    def __init__(self, nodes = [], edges = dict()):
+        self.nodes = nodes
+        self.names = list(map(lambda n: n['name'], nodes))
+        self.ids = dict(zip(self.names, range(len(self.names))))
+
+        n = len(self.names)
+        directed = edges.get(directedEdgeType.id_, CompactGraph.emptyEdges())
+        bidirected = edges.get(bidirectedEdgeType.id_, CompactGraph.emptyEdges())
+
+        self.directedEdges = directed
+        self.parents = CompactGraph.toCSR(n, directed[1], directed[0])
+        self.children = CompactGraph.toCSR(n, directed[0], directed[1])
+        self.spouses = CompactGraph.toCSR(n, *CompactGraph.symmetric(bidirected))
+        self.others = dict()
+        self.__adjacency = dict()
+
+        for type_ in edges:
+            if type_ != directedEdgeType.id_ and type_ != bidirectedEdgeType.id_:
+                self.others[type_] = CompactGraph.toCSR(n, *CompactGraph.symmetric(edges[type_]))
+
+
+    # Graph
+    # CompactGraph
+    @staticmethod
+    def fromGraph(G):
+        nodes = G.nodes
+        ids = dict(zip(map(lambda n: n['name'], nodes), range(len(nodes))))
+        edges = dict()
+
+        for edge in G.edges:
+            if edge['from_'] not in ids or edge['to_'] not in ids:
+                continue
+
+            pairs = edges.setdefault(edge['type_'], ([], []))
+            pairs[0].append(ids[edge['from_']])
+            pairs[1].append(ids[edge['to_']])
+
+        for type_ in edges:
+            edges[type_] = (np.array(edges[type_][0], dtype = np.int64), np.array(edges[type_][1], dtype = np.int64))
+
+        return CompactGraph(nodes, edges)
+
+
+    @property
+    def size(self):
+        return len(self.names)
+
+
+    # Node | Node[] | str | str[]
+    # int[]
+    def toIds(self, nodes):
+        if nodes is None:
+            return np.zeros(0, dtype = np.int64)
+
+        if isinstance(nodes, np.ndarray):
+            return np.flatnonzero(nodes) if nodes.dtype == bool else nodes
+
+        if isinstance(nodes, (str, dict)):
+            nodes = [nodes]
+
+        ids = []
+
+        for node in nodes:
+            name = node if isinstance(node, str) else node['name']
+
+            if name in self.ids:
+                ids.append(self.ids[name])
+
+        return np.array(ids, dtype = np.int64)
+
+
+    # Node | Node[] | str | str[] | int[]
+    # bool[]
+    def toMask(self, nodes):
+        mask = np.zeros(self.size, dtype = bool)
+        mask[self.toIds(nodes)] = True
+
+        return mask
+
+
+    # bool[] | int[]
+    # Node[]
+    def toNodes(self, ids):
+        ids = self.toIds(ids)
+
+        return list(map(lambda i: dict(self.nodes[i]), np.sort(ids)))
+
+
+    # EdgeType | str, Direction
+    # (int[], int[])
+    def adjacency(self, edgeType = None, direction = Direction.both):
+        # same neighbors as GraphUtils.adjacentNames: only directed edges have an orientation
+        # to follow, the other edge types are symmetric and connect both ways
+        type_ = edgeType.id_ if edgeType is not None and not isinstance(edgeType, str) else edgeType
+
+        if type_ == directedEdgeType.id_:
+            if direction == Direction.backward:
+                return self.parents
+            elif direction == Direction.forward:
+                return self.children
+        elif type_ == bidirectedEdgeType.id_:
+            return self.spouses
+        elif type_ is not None:
+            return self.others.get(type_, CompactGraph.toCSR(self.size, *CompactGraph.emptyEdges()))
+
+        if type_ not in self.__adjacency:
+            csrs = [self.parents, self.children]
+
+            if type_ is None:
+                csrs = csrs + [self.spouses] + list(self.others.values())
+
+            self.__adjacency[type_] = CompactGraph.mergeCSR(self.size, csrs)
+
+        return self.__adjacency[type_]
+
+
+    # bool[] | int[] | Node[], EdgeType, Direction
+    # bool[]
+    def reach(self, nodes, edgeType = None, direction = Direction.both):
+        (indptr, indices) = self.adjacency(edgeType, direction)
+
+        visited = self.toMask(nodes)
+        frontier = np.flatnonzero(visited)
+
+        while len(frontier) > 0:
+            reached = indices[CompactGraph.gather(indptr, frontier)]
+            reached = np.unique(reached[~visited[reached]])
+            visited[reached] = True
+            frontier = reached
+
+        return visited
+
+
+    # bool[] | int[] | Node[]
+    # bool[]
+    def ancestors(self, nodes):
+        return self.reach(nodes, directedEdgeType, Direction.backward)
+
+
+    # bool[] | int[] | Node[]
+    # bool[]
+    def descendants(self, nodes):
+        return self.reach(nodes, directedEdgeType, Direction.forward)
+
+
+    # boolean
+    # int[]
+    def topoSort(self, sort_ = False):
+        # same ordering as GraphUtils.topoSort: layers of nodes incident to directed edges,
+        # followed by the nodes without any directed edge
+        (froms, tos) = self.directedEdges
+        (indptr, indices) = self.children
+
+        indegree = np.bincount(tos, minlength = self.size)
+        involved = np.zeros(self.size, dtype = bool)
+        involved[froms] = True
+        involved[tos] = True
+
+        layer = np.flatnonzero(involved & (indegree == 0))
+        order = []
+
+        while len(layer) > 0:
+            if sort_:
+                layer = np.array(sorted(layer, key = lambda i: self.names[i]), dtype = np.int64)
+
+            order.append(layer)
+
+            reached = indices[CompactGraph.gather(indptr, layer)]
+            np.subtract.at(indegree, reached, 1)
+            reached = np.unique(reached)
+            layer = reached[indegree[reached] == 0]
+
+        order = np.concatenate(order) if len(order) > 0 else np.zeros(0, dtype = np.int64)
+
+        if len(order) != np.count_nonzero(involved):
+            raise Exception('The graph contains a directed cycle.')
+
+        return np.concatenate([order, np.flatnonzero(~involved)])
+
+
+    # boolean
+    # int[][]
+    def cComponents(self, sort_ = False):
+        assigned = np.zeros(self.size, dtype = bool)
+        components = []
+
+        for i in self.topoSort(sort_):
+            if assigned[i]:
+                continue
+
+            component = self.reach(np.array([i]), bidirectedEdgeType)
+            assigned = assigned | component
+            components.append(np.flatnonzero(component))
+
+        return components
+
+
+    # CompactGraph
+    def moralize(self):
+        (indptr, indices) = self.parents
+        edges = [self.directedEdges, CompactGraph.edgesFromCSR(self.spouses)] + list(map(CompactGraph.edgesFromCSR, self.others.values()))
+
+        # marry the parents of every node
+        counts = indptr[1:] - indptr[:-1]
+
+        for i in np.flatnonzero(counts > 1):
+            pa = indices[indptr[i]:indptr[i + 1]]
+            (a, b) = np.triu_indices(len(pa), 1)
+            edges.append((pa[a], pa[b]))
+
+        edges = CompactGraph.concatEdges(edges)
+
+        return CompactGraph(self.nodes, {undirectedEdgeType.id_: edges})
+
+
+    # int[], int[]
+    # int[]
+    @staticmethod
+    def gather(indptr, rows):
+        # positions of all entries of the given CSR rows, without a Python loop
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        total = lengths.sum()
+
+        if total == 0:
+            return np.zeros(0, dtype = np.int64)
+
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+        return offsets + np.arange(total)
+
+
+    # int, int[], int[]
+    # (int[], int[])
+    @staticmethod
+    def toCSR(n, rows, cols):
+        order = np.lexsort((cols, rows))
+        rows = rows[order]
+        cols = cols[order]
+
+        # drop repeated entries
+        if len(rows) > 0:
+            keep = np.ones(len(rows), dtype = bool)
+            keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            rows = rows[keep]
+            cols = cols[keep]
+
+        indptr = np.zeros(n + 1, dtype = np.int64)
+        np.cumsum(np.bincount(rows, minlength = n), out = indptr[1:])
+
+        return (indptr, cols.astype(np.int64))
+
+
+    @staticmethod
+    def mergeCSR(n, csrs):
+        edges = CompactGraph.concatEdges(list(map(CompactGraph.edgesFromCSR, csrs)))
+
+        return CompactGraph.toCSR(n, edges[0], edges[1])
+
+
+    @staticmethod
+    def edgesFromCSR(csr):
+        (indptr, indices) = csr
+        rows = np.repeat(np.arange(len(indptr) - 1), indptr[1:] - indptr[:-1])
+
+        return (rows, indices)
+
+
+    @staticmethod
+    def symmetric(edges):
+        return (np.concatenate([edges[0], edges[1]]), np.concatenate([edges[1], edges[0]]))
+
+
+    @staticmethod
+    def concatEdges(edges):
+        if len(edges) == 0:
+            return CompactGraph.emptyEdges()
+
+        return (np.concatenate(list(map(lambda e: e[0], edges))).astype(np.int64), np.concatenate(list(map(lambda e: e[1], edges))).astype(np.int64))
+
+
+    @staticmethod
+    def emptyEdges():
+        return (np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64))
+
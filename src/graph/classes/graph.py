@@ -1,7 +1,10 @@
+import weakref
 import networkx as nx
+import numpy as np
 from typing import List, Dict, Any
 
 from src.graph.classes.graph_defs import basicNodeType, directedEdgeType, bidirectedEdgeType, EdgeType, edgeTypeMap
+from src.graph.classes.compact_graph import CompactGraph
 from src.task.classes.task import Task
 from src.task.basic_task import BasicTask
 
@@ -17,13 +20,23 @@ class Graph():
     metadata = Dict[str, Any]
 
     def __init__(self, graph = None, nodes = [], edges = [], task = None, metadata = dict()):
+        self._view = None
+        self._views = weakref.WeakSet()
+        self._version = 0
+
         if graph is not None:
             if isinstance(graph, nx.Graph) or isinstance(graph, nx.DiGraph):
                 self.nx = graph
+                self.__reindex()
             elif isinstance(graph, Graph):
                 self.nx = graph.nx
+                self.__shareIndexes(graph)
+
+                if self._view is not None:
+                    self._view['base']._views.add(self)
         else:
             self.nx = nx.DiGraph()
+            self.__reindex()
             self.addNodes(nodes)
             self.addEdges(edges)
 
@@ -41,14 +54,7 @@ class Graph():
 
         # convert tuple to list of dictionaries
         for node in nodes:
-            n = {
-                'name': node[0],
-                'label': node[1]['label'] if 'label' in node[1] else node[0],
-                'type_': node[1]['type_'] if 'type_' in node[1] else basicNodeType.id_,
-                'metadata': node[1]['metadata'] if 'metadata' in node[1] else {}
-            }
-
-            ns.append(n)
+            ns.append(self.__toNode(node[0], node[1]))
 
         return ns
 
@@ -57,7 +63,9 @@ class Graph():
 
     @nodes.setter
     def nodes(self, nodes):
+        self.__materialize()
         self.nx.clear()
+        self.__reindex()
         self.addNodes(nodes)
 
 
@@ -67,15 +75,7 @@ class Graph():
         es = []
 
         for edge in edges:
-            e = {
-                'from_': edge[0],
-                'to_': edge[1],
-                'label': edge[2]['label'] if 'label' in edge[2] else None,
-                'type_': edge[2]['type_'] if 'type_' in edge[2] else directedEdgeType.id_,
-                'metadata': edge[2]['metadata'] if 'metadata' in edge[2] else {}
-            }
-
-            es.append(e)
+            es.append(self.__toEdge(edge[0], edge[1], edge[2]))
 
         return es
 
@@ -87,13 +87,202 @@ class Graph():
         self.addEdges(edges)
 
 
+    # builds a graph from parallel arrays of edge endpoints and (optional) edge types
+    # in one pass, with the same result as Graph(nodes = nodes, edges = [...]) on the same edges
+    # endpoints that are not in nodes are added in the order they first appear
+    # str[], str[], (str | EdgeType)[], (Node | str)[]
+    # Graph
+    @staticmethod
+    def fromArrays(froms, tos, types = None, nodes = None):
+        froms = np.asarray(froms, dtype = object)
+        tos = np.asarray(tos, dtype = object)
+        types = np.full(len(froms), None, dtype = object) if types is None else np.asarray(types, dtype = object)
+
+        if not (len(froms) == len(tos) == len(types)):
+            raise Exception('The arrays of edge endpoints and types must have the same length.')
+
+        # rows without both endpoints are skipped, as addEdges does (x != x catches NaN)
+        keep = (froms != None) & (tos != None) & (froms == froms) & (tos == tos)
+        froms = froms[keep].astype(str).astype(object)
+        tos = tos[keep].astype(str).astype(object)
+        types = Graph.__toEdgeTypeIds(types[keep])
+
+        graph = Graph()
+        if nodes is not None:
+            graph.addNodes(list(map(lambda node: {'name': node} if isinstance(node, str) else node, ou.makeArray(nodes))))
+
+        # endpoints in order of first appearance, as nx adds them one edge at a time
+        endpoints = np.column_stack([froms, tos]).ravel()
+        (_, first) = np.unique(endpoints, return_index = True)
+        newNames = filter(lambda name: not graph.hasNode(name), endpoints[np.sort(first)])
+        graph.nx.add_nodes_from(map(lambda name: (name, {'label': name, 'type_': basicNodeType.id_, 'metadata': dict()}), newNames))
+
+        # only edges between a pair of nodes that shares another edge can collide (e.g., X -> Y together with X -- Y),
+        # addEdges is replayed on those, the others are added as they are
+        pairs = np.where(froms <= tos, froms + '\0' + tos, tos + '\0' + froms)
+        (_, inverse, counts) = np.unique(pairs, return_inverse = True, return_counts = True)
+        shared = counts[inverse] > 1
+
+        steps = np.flatnonzero(~shared)
+        edges = list(zip(steps, froms[steps], tos[steps], types[steps]))
+        steps = np.flatnonzero(shared)
+        edges = edges + Graph.__replayEdges(zip(steps, froms[steps], tos[steps], types[steps]))
+
+        # nx lists the edges of a node in the order they were (last) inserted
+        edges.sort(key = lambda edge: edge[0])
+
+        graph.nx.add_edges_from(map(lambda edge: (edge[1], edge[2], {'label': None, 'type_': edge[3], 'metadata': dict()}), edges))
+        graph.__reindex()
+
+        return graph
+
+    # the edges left by calling addEdges on the given edges in order, each with the step at which it was (last) inserted
+    # (int, str, str, str)[]
+    # (int, str, str, str)[]
+    @staticmethod
+    def __replayEdges(edges):
+        # (from_, to_) -> [step, type_]
+        state = dict()
+
+        def add(step, from_, to_, type_):
+            if (from_, to_) in state:
+                existingType = state[(from_, to_)][1]
+
+                # if adding X -> Y, remove X -- Y and add Y -- X first
+                if type_ == directedEdgeType.id_:
+                    if existingType == bidirectedEdgeType.id_:
+                        del state[(from_, to_)]
+                        add(step, to_, from_, existingType)
+                    else:
+                        raise Graph.__edgeExistsError(from_, to_, type_)
+
+                # if adding X -- Y, flip from/to and add Y -- X instead
+                elif type_ == bidirectedEdgeType.id_:
+                    if existingType == directedEdgeType.id_:
+                        (from_, to_) = (to_, from_)
+                    else:
+                        raise Graph.__edgeExistsError(from_, to_, type_)
+
+            # nx updates an existing edge in place
+            if (from_, to_) in state:
+                state[(from_, to_)][1] = type_
+            else:
+                state[(from_, to_)] = [step, type_]
+
+        for (step, from_, to_, type_) in edges:
+            add(step, from_, to_, type_)
+
+        return list(map(lambda item: (item[1][0], item[0][0], item[0][1], item[1][1]), state.items()))
+
+    # str, str, str
+    # Exception
+    @staticmethod
+    def __edgeExistsError(from_, to_, type_):
+        edgeType = directedEdgeType
+
+        for id_ in edgeTypeMap:
+            if type_.upper() == edgeTypeMap[id_].id_.upper():
+                edgeType = edgeTypeMap[id_]
+                break
+
+        return Exception('The edge ' + from_ + ' ' + edgeType.shortId + ' ' + to_ + ' already exists.')
+
+    # accepts edge type ids, short ids (e.g., '->' and '--') or EdgeTypes, and defaults to directed
+    # (str | EdgeType)[]
+    # str[]
+    @staticmethod
+    def __toEdgeTypeIds(types):
+        ids = dict()
+
+        for edgeType in edgeTypeMap.values():
+            ids[edgeType.id_] = edgeType.id_
+            ids[edgeType.shortId] = edgeType.id_
+
+        def toId(type_):
+            if isinstance(type_, EdgeType):
+                return type_.id_
+            elif type_ is None or type_ != type_:
+                return directedEdgeType.id_
+
+            type_ = str(type_).strip()
+
+            return ids[type_] if type_ in ids else type_
+
+        return np.array(list(map(toId, types)), dtype = object)
+
+
     def copy(self):
         return Graph(self.nx.copy())
 
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_views']
+
+        # the filters of a view cannot be pickled, so it is sent as a copy of what it shows
+        if self._view is not None:
+            state['nx'] = self.nx.copy()
+            state['_view'] = None
+            state['_caches'] = None
+
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views = weakref.WeakSet()
+
+        if self._caches is None:
+            self.__reindex()
+
+
+    # read-only view of the graph restricted to the given nodes and without the given edges,
+    # nothing is copied until the view itself is changed, at which point it becomes a copy
+    # the view aliases the graph it was taken from: it follows later changes of that graph,
+    # including its nodes being replaced or its conversion with toUndirected
+    # a view is pickled as an independent copy of what it shows
+    # str[] | Dict[str, Any], (str, str)[] | Dict[(str, str), Any]
+    # Graph
+    def view(self, names = None, hiddenEdges = None):
+        base = self if self._view is None else self._view['base']
+        visible = None if names is None else dict(map(lambda name: (name, True), names))
+        hidden = dict() if hiddenEdges is None else dict(map(lambda edge: (edge, True), hiddenEdges))
+
+        # views of views are taken directly from the underlying graph
+        if self._view is not None:
+            if self._view['nodes'] is not None:
+                visible = dict(filter(lambda item: item[0] in visible, self._view['nodes'].items())) if visible is not None else self._view['nodes']
+
+            hidden = {**self._view['edges'], **hidden}
+
+        graph = Graph()
+        graph._view = {
+            'base': base,
+            'nodes': visible,
+            'edges': hidden
+        }
+        graph.__bindView()
+        base._views.add(graph)
+
+        return graph
+
+
+    # array-backed snapshot of the graph, rebuilt after any change
+    # CompactGraph
+    def compact(self):
+        self.__refresh()
+
+        if 'compact' not in self._caches:
+            self._caches['compact'] = CompactGraph.fromGraph(self)
+
+        return self._caches['compact']
+
+
     def toUndirected(self):
         # return self.nx.to_undirected()
+        self.__materialize()
         self.nx = nx.Graph(self.nx)
+        self.__reindex()
 
         # change all edge types
 
@@ -103,6 +292,8 @@ class Graph():
         
         if not nodes or len(nodes) == 0:
             return
+
+        self.__materialize()
         
         for node in nodes:
             # should we throw error if name is not specified?
@@ -132,10 +323,10 @@ class Graph():
 
         if not nodes or len(nodes) == 0:
             return
+
+        self.__materialize()
         
-        self.deleteEdges(gu.getIncoming(nodes, self))
-        self.deleteEdges(gu.getOutgoing(nodes, self))
-        
+        # nx drops the incident edges together with the node
         # can we delete all at once instead?
         for node in nodes:
             self.__deleteNode(node)
@@ -147,6 +338,8 @@ class Graph():
         if not edges or len(edges) == 0:
             return
 
+        self.__materialize()
+
         for edge in edges:
             # if not hasattr(edge, 'from_') or not hasattr(edge, 'to_'):
             if 'from_' not in edge or 'to_' not in edge:
@@ -166,12 +359,7 @@ class Graph():
             
             # nx has a 'bug': if X -- Y exists, adding X -> Y will overwrite X -- Y, or vice versa
             if self.nx.has_edge(edge['from_'], edge['to_']):
-                existingEdge = None
-
-                for e in self.edges:
-                    if e['from_'] == edge['from_'] and e['to_'] == edge['to_']:
-                        existingEdge = e
-                        break
+                existingEdge = self.getEdge(edge['from_'], edge['to_'])
                 
                 # if adding X -> Y, remove X -- Y and add Y -- X first
                 if edge['type_'] == directedEdgeType.id_:
@@ -184,14 +372,7 @@ class Graph():
                         
                         self.addEdges(existingEdge)
                     else:
-                        edgeType = directedEdgeType
-
-                        for id_ in edgeTypeMap:
-                            if edge['type_'].upper() == edgeTypeMap[id_].id_.upper():
-                                edgeType = edgeTypeMap[id_]
-                                break
-
-                        raise Exception('The edge ' + edge['from_'] + ' ' + edgeType.shortId + ' ' + edge['to_'] + ' already exists.')
+                        raise Graph.__edgeExistsError(edge['from_'], edge['to_'], edge['type_'])
 
                 # if adding X -- Y, flip from/to and add Y -- X instead
                 elif edge['type_'] == bidirectedEdgeType.id_:
@@ -200,14 +381,7 @@ class Graph():
                         edge['from_'] = edge['to_']
                         edge['to_'] = temp
                     else:
-                        edgeType = directedEdgeType
-
-                        for id_ in edgeTypeMap:
-                            if edge['type_'].upper() == edgeTypeMap[id_].id_.upper():
-                                edgeType = edgeTypeMap[id_]
-                                break
-
-                        raise Exception('The edge ' + edge['from_'] + ' ' + edgeType.shortId + ' ' + edge['to_'] + ' already exists.')
+                        raise Graph.__edgeExistsError(edge['from_'], edge['to_'], edge['type_'])
 
             # test if the new edge generates a cycle
             self.__addEdge(edge)
@@ -219,6 +393,8 @@ class Graph():
         if not edges or len(edges) == 0:
             return
 
+        self.__materialize()
+
         # can we delete all at once instead?
         for edge in edges:
             self.__deleteEdge(edge)
@@ -232,19 +408,12 @@ class Graph():
         if not nodes or len(nodes) == 0:
             return []
 
-        names = dict()
         parents = dict()
         
         for node in nodes:
-            names[node['name']] = True
-        
-        for edge in self.edges:
-            if edge['type_'] == directedEdgeType.id_ and edge['to_'] in names:
-                parents[edge['from_']] = True
+            parents.update(self.parentNames(node['name']))
         
-        p = list(filter(lambda n: n['name'] in parents, self.nodes))
-        
-        return p
+        return self.nodesFromNames(parents)
 
 
     def ancestors(self, nodes):
@@ -288,19 +457,12 @@ class Graph():
     def children(self, nodes):
         nodes = ou.makeArray(nodes)
 
-        names = dict()
         children = dict()
 
         for node in nodes:
-            names[node['name']] = True
-        
-        for edge in self.edges:
-            if edge['type_'] == directedEdgeType.id_ and edge['from_'] in names:
-                children[edge['to_']] = True
+            children.update(self.childNames(node['name']))
 
-        c = list(filter(lambda n: n['name'] in children, self.nodes))
-        
-        return c
+        return self.nodesFromNames(children)
 
 
     # Node | Node[], EdgeType | str
@@ -320,17 +482,164 @@ class Graph():
         for node in nodes:
             names[node['name']] = True
 
-        edges = list(filter(lambda e: e['type_'] == edgeType if edgeType else True, self.edges))
-        
-        for edge in edges:
-            if edge['to_'] in names:
-                neighbors[edge['from_']] = True
-            if edge['from_'] in names:
-                neighbors[edge['to_']] = True
-        
-        n = list(filter(lambda n: n['name'] in neighbors and n['name'] not in names, self.nodes))
+        for node in nodes:
+            for name in self.neighborNames(node['name'], edgeType):
+                if name not in names:
+                    neighbors[name] = True
         
-        return n
+        return self.nodesFromNames(neighbors)
+
+
+    # str
+    # Dict[str, boolean]
+    def parentNames(self, name):
+        if self._view is not None:
+            return self.__viewNames(directedEdgeType.id_, name, lambda base: base.parentNames(name), lambda other: [(other, name)], 'parents')
+
+        return self._parents.get(name, {})
+
+
+    # str
+    # Dict[str, boolean]
+    def childNames(self, name):
+        if self._view is not None:
+            return self.__viewNames(directedEdgeType.id_, name, lambda base: base.childNames(name), lambda other: [(name, other)], 'children')
+
+        return self._children.get(name, {})
+
+
+    # str
+    # Dict[str, boolean]
+    def spouseNames(self, name):
+        if self._view is not None:
+            return self.__viewNames(bidirectedEdgeType.id_, name, lambda base: base.spouseNames(name), lambda other: [(name, other), (other, name)])
+
+        return self._spouses.get(name, {})
+
+
+    # str, EdgeType | str
+    # Dict[str, boolean]
+    def neighborNames(self, name, edgeType = None):
+        if isinstance(edgeType, EdgeType):
+            edgeType = edgeType.id_
+
+        if edgeType == directedEdgeType.id_:
+            return {**self.parentNames(name), **self.childNames(name)}
+        elif edgeType == bidirectedEdgeType.id_:
+            return self.spouseNames(name)
+        elif edgeType is not None:
+            return self.__otherNames(edgeType, name)
+
+        neighbors = {**self.parentNames(name), **self.childNames(name), **self.spouseNames(name)}
+
+        for type_ in self.otherEdgeTypes():
+            neighbors.update(self.__otherNames(type_, name))
+
+        return neighbors
+
+
+    # names of the ancestors of the given nodes, including the nodes themselves
+    # str[] | Dict[str, Any]
+    # Dict[str, boolean]
+    def ancestorNames(self, names):
+        if self._view is not None:
+            return self.__search(names, self.parentNames)
+
+        return self.__namesFromBits(self.__closureBits('ancestors', names))
+
+
+    # names of the descendants of the given nodes, including the nodes themselves
+    # str[] | Dict[str, Any]
+    # Dict[str, boolean]
+    def descendantNames(self, names):
+        if self._view is not None:
+            return self.__search(names, self.childNames)
+
+        return self.__namesFromBits(self.__closureBits('descendants', names))
+
+
+    # names of the nodes of each c-component, in the topological order of their first node
+    # boolean
+    # str[][]
+    def cComponentNames(self, sort_ = False):
+        self.__refresh()
+
+        components = self._caches.setdefault('cComponents', dict())
+
+        if sort_ not in components:
+            components[sort_] = self.__cComponentNames(sort_)
+
+        return list(map(list, components[sort_]))
+
+
+    # names of the nodes that match the given name up to case and surrounding whitespace, in node order
+    # str
+    # Dict[str, boolean]
+    def matchingNames(self, name):
+        base = self if self._view is None else self._view['base']
+        names = base._normalized.get(gu.correctNodeName(name), {})
+
+        if self._view is not None:
+            names = dict(filter(lambda item: self.hasNode(item[0]), names.items()))
+
+        return names
+
+
+    # the edge from_ -> to_ (of the given type, if any), looked up in the adjacency of nx
+    # str, str, str
+    # Edge
+    def getEdge(self, from_, to_, type_ = None):
+        data = self.nx.get_edge_data(from_, to_)
+
+        if data is None:
+            return None
+
+        # an undirected nx graph reports every edge from the endpoint that comes first
+        if not self.nx.is_directed() and from_ != to_ and self._order[from_] > self._order[to_]:
+            return None
+
+        edge = self.__toEdge(from_, to_, data)
+
+        if type_ is not None and edge['type_'] != type_:
+            return None
+
+        return edge
+
+
+    # str
+    # boolean
+    def hasNode(self, name):
+        if self._view is not None:
+            return self._view['base'].hasNode(name) and (self._view['nodes'] is None or name in self._view['nodes'])
+
+        return name in self._order
+
+
+    # edge types other than directed and bidirected that are present in the graph
+    # str[]
+    def otherEdgeTypes(self):
+        if self._view is not None:
+            self.__refresh()
+
+            if 'otherEdgeTypes' not in self._caches:
+                # a view only hides edges, so it can only lose edge types of the underlying graph
+                types = self._view['base'].otherEdgeTypes()
+                types = list(filter(lambda type_: any(map(lambda name: len(self.__otherNames(type_, name)) > 0, self.nx.nodes)), types))
+
+                self._caches['otherEdgeTypes'] = types
+
+            return self._caches['otherEdgeTypes']
+
+        return list(filter(lambda type_: any(self._others[type_].values()), self._others))
+
+
+    # str[] | Dict[str, Any]
+    # Node[]
+    def nodesFromNames(self, names):
+        # keep the order in which nodes were added to the graph
+        names = sorted(filter(self.hasNode, names), key = self._order.__getitem__)
+
+        return list(map(lambda name: self.__toNode(name, self.nx.nodes[name]), names))
 
 
     def connectedComponents(self):
@@ -375,12 +684,398 @@ class Graph():
 
     def __addNode(self, node):
         self.nx.add_node(node['name'], label = node['label'], type_ = node['type_'], metadata = node['metadata'])
+        self.__indexNode(node['name'])
+        self.__dropSnapshots()
 
     def __deleteNode(self, node):
+        isolated = len(self.parentNames(node['name'])) == 0 and len(self.childNames(node['name'])) == 0
+
         self.nx.remove_node(node['name'])
+        self.__unindexNode(node['name'])
+        self.__dropSnapshots()
+
+        # removing a node may cut directed paths through it
+        if not isolated:
+            self.__dropClosures()
 
     def __addEdge(self, edge):
+        replaced = self.nx.has_edge(edge['from_'], edge['to_'])
+
         self.nx.add_edge(edge['from_'], edge['to_'], label = edge['label'], type_ = edge['type_'], metadata = edge['metadata'])
+        # nx silently adds missing endpoints
+        self.__indexNode(edge['from_'])
+        self.__indexNode(edge['to_'])
+        self.__indexPair(edge['from_'], edge['to_'])
+        self.__dropSnapshots()
+
+        if replaced:
+            self.__dropClosures()
+        elif edge['type_'] == directedEdgeType.id_:
+            self.__extendClosures(edge['from_'], edge['to_'])
 
     def __deleteEdge(self, edge):
-        self.nx.remove_edge(edge['from_'], edge['to_'])
\ No newline at end of file
+        data = self.nx.get_edge_data(edge['from_'], edge['to_'])
+
+        self.nx.remove_edge(edge['from_'], edge['to_'])
+        self.__indexPair(edge['from_'], edge['to_'])
+        self.__dropSnapshots()
+
+        # a deleted directed edge may cut any number of paths, so the closures are recomputed on demand
+        if data is None or 'type_' not in data or data['type_'] == directedEdgeType.id_:
+            self.__dropClosures()
+
+    def __toEdge(self, from_, to_, data):
+        return {
+            'from_': from_,
+            'to_': to_,
+            'label': data['label'] if 'label' in data else None,
+            'type_': data['type_'] if 'type_' in data else directedEdgeType.id_,
+            'metadata': data['metadata'] if 'metadata' in data else {}
+        }
+
+    def __toNode(self, name, data):
+        return {
+            'name': name,
+            'label': data['label'] if 'label' in data else name,
+            'type_': data['type_'] if 'type_' in data else basicNodeType.id_,
+            'metadata': data['metadata'] if 'metadata' in data else {}
+        }
+
+    # adjacency indexes, kept in sync with self.nx
+    # _parents / _children: directed edges, _spouses: bidirected edges
+    # _others: any other edge type (e.g., undirected), keyed by type
+    # _normalized: node names keyed by their normalized name (see GraphUtils.correctNodeName)
+    def __reindex(self):
+        self._version = self._version + 1
+        self._order = dict()
+        self._nextOrder = 0
+        self._parents = dict()
+        self._children = dict()
+        self._spouses = dict()
+        self._others = dict()
+        self._names = dict()
+        self._normalized = dict()
+        self._caches = dict()
+
+        for name in self.nx.nodes:
+            self.__indexNode(name)
+
+        for (from_, to_, type_) in self.nx.edges(data = 'type_', default = directedEdgeType.id_):
+            self.__indexEdge(from_, to_, type_)
+
+        # the views taken from this graph drop the indexes and the nx graph it just replaced
+        for view in list(self._views):
+            view.__bindView()
+
+    def __shareIndexes(self, graph):
+        self._order = graph._order
+        self._nextOrder = graph._nextOrder
+        self._parents = graph._parents
+        self._children = graph._children
+        self._spouses = graph._spouses
+        self._others = graph._others
+        self._names = graph._names
+        self._normalized = graph._normalized
+        self._caches = graph._caches
+        self._view = graph._view
+
+    def __indexNode(self, name):
+        if name in self._order:
+            return
+
+        self._order[name] = self._nextOrder
+        self._names[self._nextOrder] = name
+        self._nextOrder = self._nextOrder + 1
+        self._normalized.setdefault(gu.correctNodeName(name), dict())[name] = True
+
+        # a new node is its own ancestor and descendant
+        for key in ['ancestors', 'descendants']:
+            if key in self._caches:
+                self._caches[key][name] = 1 << self._order[name]
+
+    def __unindexNode(self, name):
+        # _parents and _children mirror each other, the other indexes are symmetric
+        pairs = [(self._parents, self._children), (self._children, self._parents), (self._spouses, self._spouses)]
+        pairs = pairs + list(map(lambda index: (index, index), self._others.values()))
+
+        for (index, mirror) in pairs:
+            for other in index.pop(name, {}):
+                if other in mirror:
+                    mirror[other].pop(name, None)
+
+        for key in ['ancestors', 'descendants']:
+            if key in self._caches:
+                self._caches[key].pop(name, None)
+
+        normalized = gu.correctNodeName(name)
+        del self._normalized[normalized][name]
+
+        if len(self._normalized[normalized]) == 0:
+            del self._normalized[normalized]
+
+        del self._names[self._order[name]]
+        del self._order[name]
+
+    # recompute the index entries between a and b from the edges stored in nx
+    def __indexPair(self, a, b):
+        for index in [self._parents, self._children, self._spouses] + list(self._others.values()):
+            if a in index:
+                index[a].pop(b, None)
+            if b in index:
+                index[b].pop(a, None)
+
+        # an undirected nx graph reports the same edge in both orientations
+        pairs = [(a, b), (b, a)] if self.nx.is_directed() else [(a, b)]
+
+        for (from_, to_) in pairs:
+            data = self.nx.get_edge_data(from_, to_)
+
+            if data is None:
+                continue
+
+            self.__indexEdge(from_, to_, data['type_'] if 'type_' in data else directedEdgeType.id_)
+
+    def __indexEdge(self, from_, to_, type_):
+        if type_ == directedEdgeType.id_:
+            self._children.setdefault(from_, dict())[to_] = True
+            self._parents.setdefault(to_, dict())[from_] = True
+        elif type_ == bidirectedEdgeType.id_:
+            self._spouses.setdefault(from_, dict())[to_] = True
+            self._spouses.setdefault(to_, dict())[from_] = True
+        else:
+            index = self._others.setdefault(type_, dict())
+            index.setdefault(from_, dict())[to_] = True
+            index.setdefault(to_, dict())[from_] = True
+
+    # snapshots that have to be rebuilt after any change of nodes or edges
+    def __dropSnapshots(self):
+        self._version = self._version + 1
+        self._caches.pop('compact', None)
+        self._caches.pop('cComponents', None)
+
+    # union-find over the bidirected edges
+    # boolean
+    # str[][]
+    def __cComponentNames(self, sort_):
+        roots = dict()
+
+        def find(name):
+            while roots[name] != name:
+                # path halving
+                roots[name] = roots[roots[name]]
+                name = roots[name]
+
+            return name
+
+        for name in self.nx.nodes:
+            roots[name] = name
+
+        for name in self.nx.nodes:
+            for spouse in self.spouseNames(name):
+                (a, b) = (find(name), find(spouse))
+
+                if a != b:
+                    roots[b] = a
+
+        components = dict()
+
+        for node in gu.topoSort(self, sort_):
+            root = find(node['name'])
+
+            if root not in components:
+                components[root] = []
+
+        for name in self.nx.nodes:
+            components[find(name)].append(name)
+
+        return list(components.values())
+
+    # ancestor / descendant closures, stored as bitsets over the node order (bit i is the node with _order i)
+    # they are computed once in topological order and extended in place when a directed edge is added
+    def __closureBits(self, key, names):
+        self.__refresh()
+
+        if key not in self._caches:
+            self._caches['ancestors'] = self.__closure(self.parentNames, self.childNames)
+            self._caches['descendants'] = self.__closure(self.childNames, self.parentNames)
+
+        closure = self._caches[key]
+        bits = 0
+
+        for name in names:
+            bits = bits | closure.get(name, 0)
+
+        return bits
+
+    # str -> Dict[str, boolean], str -> Dict[str, boolean]
+    # Dict[str, int]
+    def __closure(self, incoming, outgoing):
+        closure = dict()
+        pending = dict()
+        ready = []
+
+        for name in self.nx.nodes:
+            pending[name] = len(incoming(name))
+
+            if pending[name] == 0:
+                ready.append(name)
+
+        while len(ready) > 0:
+            name = ready.pop()
+            bits = 1 << self._order[name]
+
+            for other in incoming(name):
+                bits = bits | closure[other]
+
+            closure[name] = bits
+
+            for other in outgoing(name):
+                pending[other] = pending[other] - 1
+
+                if pending[other] == 0:
+                    ready.append(other)
+
+        # nodes on or below a directed cycle never become ready, search from each of them instead
+        for name in self.nx.nodes:
+            if name in closure:
+                continue
+
+            bits = 0
+            fringe = [name]
+            visited = dict()
+
+            while len(fringe) > 0:
+                current = fringe.pop()
+
+                if current in visited:
+                    continue
+
+                visited[current] = True
+                bits = bits | (1 << self._order[current])
+                fringe.extend(incoming(current))
+
+            closure[name] = bits
+
+        return closure
+
+    # from_ -> to_ makes every ancestor of from_ an ancestor of every descendant of to_
+    def __extendClosures(self, from_, to_):
+        if 'ancestors' not in self._caches:
+            return
+
+        ancestors = self._caches['ancestors'][from_]
+        descendants = self._caches['descendants'][to_]
+
+        for name in self.__namesFromBits(descendants):
+            self._caches['ancestors'][name] = self._caches['ancestors'][name] | ancestors
+
+        for name in self.__namesFromBits(ancestors):
+            self._caches['descendants'][name] = self._caches['descendants'][name] | descendants
+
+    def __dropClosures(self):
+        self._caches.pop('ancestors', None)
+        self._caches.pop('descendants', None)
+
+    # int
+    # Dict[str, boolean]
+    def __namesFromBits(self, bits):
+        names = dict()
+
+        while bits:
+            lowest = bits & -bits
+            names[self._names[lowest.bit_length() - 1]] = True
+            bits = bits ^ lowest
+
+        return names
+
+    # views keep no indexes of their own: they filter the indexes of the underlying graph
+    # and drop whatever they derived from it as soon as that graph changes
+    def __refresh(self):
+        if self._view is None or self._view['version'] == self._view['base']._version:
+            return
+
+        self._caches = dict()
+        self._view['version'] = self._view['base']._version
+
+    # str, str, Graph -> Dict[str, boolean], str -> (str, str)[], str
+    # Dict[str, boolean]
+    def __viewNames(self, type_, name, namesOf, edgesTo, key = None):
+        self.__refresh()
+
+        index = self._caches.setdefault(('adjacency', key if key is not None else type_), dict())
+
+        base = self._view['base']
+        hidden = self._view['edges']
+        isDirected = base.nx.is_directed()
+
+        def isVisible(edge):
+            data = base.nx.get_edge_data(*edge)
+
+            if data is None or (data['type_'] if 'type_' in data else directedEdgeType.id_) != type_:
+                return False
+
+            return edge not in hidden and (isDirected or (edge[1], edge[0]) not in hidden)
+
+        if name not in index:
+            names = dict()
+
+            if self.hasNode(name):
+                for other in namesOf(base):
+                    if self.hasNode(other) and any(map(isVisible, edgesTo(other))):
+                        names[other] = True
+
+            index[name] = names
+
+        return index[name]
+
+    # str, str
+    # Dict[str, boolean]
+    def __otherNames(self, type_, name):
+        if self._view is not None:
+            return self.__viewNames(type_, name, lambda base: base.neighborNames(name, type_), lambda other: [(name, other), (other, name)])
+
+        return self._others.get(type_, {}).get(name, {})
+
+    # views are usually short-lived, so they search instead of building closures
+    # str[] | Dict[str, Any], str -> Dict[str, boolean]
+    # Dict[str, boolean]
+    def __search(self, names, adjacent):
+        fringe = list(filter(self.hasNode, names))
+        visited = dict()
+
+        while len(fringe) > 0:
+            name = fringe.pop()
+
+            if name in visited:
+                continue
+
+            visited[name] = True
+            fringe.extend(adjacent(name))
+
+        return visited
+
+    # filter the current nx graph and indexes of the underlying graph
+    def __bindView(self):
+        base = self._view['base']
+        visible = self._view['nodes']
+        hidden = self._view['edges']
+        isDirected = base.nx.is_directed()
+
+        def isVisibleEdge(from_, to_):
+            return (from_, to_) not in hidden and (isDirected or (to_, from_) not in hidden)
+
+        self.nx = nx.subgraph_view(base.nx, filter_node = lambda name: visible is None or name in visible, filter_edge = isVisibleEdge)
+        self._order = base._order
+        self._names = base._names
+        self._caches = dict()
+        self._view['version'] = base._version
+
+    # a view turns into an independent copy before it is changed
+    def __materialize(self):
+        if self._view is None:
+            return
+
+        self._view['base']._views.discard(self)
+        self.nx = self.nx.copy()
+        self._view = None
+        self.__reindex()
@@ -1,3 +1,5 @@
+from enum import Enum
+
 class NodeType():
 
     id_: str
@@ -20,6 +22,11 @@ class EdgeType():
         self.name = name
         self.shortId = shortId
 
+class Direction(Enum):
+    both = 0
+    forward = 1
+    backward = 2
+
 def isNodeType(nodeType):
     return isinstance(nodeType, NodeType)
 
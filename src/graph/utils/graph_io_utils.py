@@ -0,0 +1,40 @@
+import pandas as pd
+
+from src.graph.classes.graph import Graph
+
+
+class GraphIOUtils():
+    """
+    Bulk loading of graphs from edge lists: one row per edge with the columns
+    from, to and (optionally) type, where the type is an edge type id (e.g., directed)
+    or its short id (e.g., ->). Rows without a type are directed edges.
+    """
+
+    # DataFrame, str, str, str, (Node | str)[]
+    # Graph
+    @staticmethod
+    def fromDataFrame(df, fromColumn = 'from', toColumn = 'to', typeColumn = 'type', nodes = None):
+        for column in [fromColumn, toColumn]:
+            if column not in df.columns:
+                raise Exception('The edge list has no column ' + column + '.')
+
+        types = df[typeColumn].to_numpy(dtype = object) if typeColumn in df.columns else None
+
+        return Graph.fromArrays(df[fromColumn].to_numpy(dtype = object), df[toColumn].to_numpy(dtype = object), types, nodes)
+
+    # str, str, str, str, (Node | str)[]
+    # Graph
+    @staticmethod
+    def readCSV(path, fromColumn = 'from', toColumn = 'to', typeColumn = 'type', nodes = None, **options):
+        # node names are kept as written, e.g., 01 is not read as the number 1
+        df = pd.read_csv(path, dtype = str, skipinitialspace = True, **options)
+
+        return GraphIOUtils.fromDataFrame(df, fromColumn, toColumn, typeColumn, nodes)
+
+    # str, str, str, str, (Node | str)[]
+    # Graph
+    @staticmethod
+    def readParquet(path, fromColumn = 'from', toColumn = 'to', typeColumn = 'type', nodes = None, **options):
+        df = pd.read_parquet(path, **options)
+
+        return GraphIOUtils.fromDataFrame(df, fromColumn, toColumn, typeColumn, nodes)
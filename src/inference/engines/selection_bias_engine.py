@@ -185,11 +185,11 @@ class SelectionBiasEngine(BaseEngine):
         TAndW = su.intersection(self.T0, W, 'name')
         self.Tprime = []
 
-        for w in W:
-            if su.equals([w], [S], 'name') or su.belongs(w, TAndW, compareNames):
-                continue
+        candidates = list(filter(lambda w: not su.equals([w], [S], 'name') and not su.belongs(w, TAndW, compareNames), W))
+        separated = DSeparation.testMany(G_W, list(map(lambda w: (S, w, TAndW), candidates)))
 
-            if DSeparation.test(G_W, S, w, TAndW):
+        for (w, isSeparated) in zip(candidates, separated):
+            if isSeparated:
                 self.Tprime.append(w)
 
         self.T = su.union(self.Tprime, TAndW, 'name')
@@ -378,11 +378,11 @@ class SelectionBiasEngine(BaseEngine):
             su.difference(V, H, 'name'), G), 'name')
         Tprime = []
 
-        for h in H:
-            if su.equals([h], [S], 'name') or su.belongs(h, T0H, compareNames):
-                continue
+        candidates = list(filter(lambda h: not su.equals([h], [S], 'name') and not su.belongs(h, T0H, compareNames), H))
+        separated = DSeparation.testMany(G_H, list(map(lambda h: (h, S, T0H), candidates)))
 
-            if DSeparation.test(G_H, h, S, T0H):
+        for (h, isSeparated) in zip(candidates, separated):
+            if isSeparated:
                 Tprime.append(h)
 
         TH = su.union(T0H, Tprime, 'name')
@@ -423,11 +423,11 @@ class SelectionBiasEngine(BaseEngine):
             su.difference(V, H, 'name'), G), 'name')
         Tprime = []
 
-        for h in H:
-            if su.equals([h], [S], 'name') or su.belongs(h, T0H, compareNames):
-                continue
+        candidates = list(filter(lambda h: not su.equals([h], [S], 'name') and not su.belongs(h, T0H, compareNames), H))
+        separated = DSeparation.testMany(G_H, list(map(lambda h: (h, S, T0H), candidates)))
 
-            if DSeparation.test(G_H, h, S, T0H):
+        for (h, isSeparated) in zip(candidates, separated):
+            if isSeparated:
                 Tprime.append(h)
 
         TH = su.union(T0H, Tprime, 'name')
@@ -1,7 +1,7 @@
-from enum import Enum
 from toposort import toposort_flatten
 
-from src.graph.classes.graph_defs import basicNodeType, latentNodeType, directedEdgeType, bidirectedEdgeType, undirectedEdgeType
+from src.graph.classes.graph_defs import basicNodeType, latentNodeType, directedEdgeType, bidirectedEdgeType, undirectedEdgeType, Direction
+from src.graph.classes.compact_graph import CompactGraph
 
 from src.inference.utils.set_utils import SetUtils as su
 from src.common.object_utils import ObjectUtils as ou
@@ -10,12 +10,6 @@ distribution_ids = 'distribution_ids'
 suffix = '\''
 
 
-class Direction(Enum):
-    both = 0
-    forward = 1
-    backward = 2
-
-
 def sortByName(node):
     return node['name']
 
@@ -169,7 +163,11 @@ class GraphUtils():
     @staticmethod
     def ancestors(w, G):
         # return G.ancestors(w)
-        return GraphUtils.reach(w, G, directedEdgeType, Direction.backward)
+        if isinstance(G, CompactGraph):
+            return GraphUtils.reach(w, G, directedEdgeType, Direction.backward)
+
+        # the graph keeps its ancestor closure up to date
+        return G.nodesFromNames(G.ancestorNames(map(lambda n: n['name'], ou.makeArray(w))))
     
     @staticmethod
     def ancestorsPlus(w, G):
@@ -182,7 +180,10 @@ class GraphUtils():
     @staticmethod
     def descendants(w, G):
         # return G.descendants(w)
-        return GraphUtils.reach(w, G, directedEdgeType, Direction.forward)
+        if isinstance(G, CompactGraph):
+            return GraphUtils.reach(w, G, directedEdgeType, Direction.forward)
+
+        return G.nodesFromNames(G.descendantNames(map(lambda n: n['name'], ou.makeArray(w))))
 
     @staticmethod
     def descendantsPlus(w, G):
@@ -235,18 +236,22 @@ class GraphUtils():
     def reach(w, G, edgeType=None, direction=Direction.both):
         w = ou.makeArray(w)
 
-        edges = []
+        if isinstance(G, CompactGraph):
+            return G.toNodes(G.reach(w, edgeType, direction))
 
-        if not edgeType:
-            edges = G.edges
-        else:
-            edges = list(filter(lambda e: e['type_'] == edgeType.id_, G.edges))
+        visited = GraphUtils.reachNames(list(map(lambda n: n['name'], w)), G, edgeType, direction)
 
-        fringe = []
-        visited = dict()
+        reachableNodes = G.nodesFromNames(visited)
 
-        for node in w:
-            fringe.append(node['name'])
+        return reachableNodes
+
+    # str[], Graph, EdgeType, Direction
+    # Dict[str, boolean]
+
+    @staticmethod
+    def reachNames(names, G, edgeType=None, direction=Direction.both):
+        fringe = list(names)
+        visited = dict()
 
         while len(fringe) > 0:
             nodeName = fringe.pop()
@@ -257,24 +262,25 @@ class GraphUtils():
 
             visited[nodeName] = True
 
-            for edge in edges:
-                if (
-                    (direction == Direction.both or direction == Direction.backward)
-                    and edge['to_'] == nodeName
-                    and edge['from_'] not in visited
-                ):
-                    fringe.append(edge['from_'])
+            for name in GraphUtils.adjacentNames(nodeName, G, edgeType, direction):
+                if name not in visited:
+                    fringe.append(name)
 
-                if (
-                    (direction == Direction.both or direction == Direction.forward)
-                    and edge['from_'] == nodeName
-                    and edge['to_'] not in visited
-                ):
-                    fringe.append(edge['to_'])
+        return visited
 
-        reachableNodes = list(filter(lambda n: n['name'] in visited, G.nodes))
+    # str, Graph, EdgeType, Direction
+    # Dict[str, boolean]
 
-        return reachableNodes
+    @staticmethod
+    def adjacentNames(name, G, edgeType=None, direction=Direction.both):
+        # only directed edges have an orientation to follow
+        if edgeType is not None and edgeType.id_ == directedEdgeType.id_:
+            if direction == Direction.backward:
+                return G.parentNames(name)
+            elif direction == Direction.forward:
+                return G.childNames(name)
+
+        return G.neighborNames(name, edgeType)
 
     # Graph, str[]
     # Node[]
@@ -351,25 +357,18 @@ class GraphUtils():
         if subset is None:
             return G
 
-        graph = G.copy()
-        graph.deleteNodes(graph.nodes)
-        graph.addNodes(su.intersection(G.nodes, subset, 'name'))
-
         sub = dict()
 
         for node in subset:
             sub[node['name']] = True
 
-        edges = list(filter(lambda e: e['from_']
-                     in sub and e['to_'] in sub, G.edges))
-
         # if activeEdges:
         #     edges = list(filter(lambda e: e['from_'] == ))
 
-        graph.deleteEdges(graph.edges)
-        graph.addEdges(edges)
-
-        return graph
+        # a view keeps the edges among the nodes of the subset without copying the graph
+        # unlike a copy, it follows later changes of G (see Graph.view), so callers that change G
+        # and still need the subgraph as it was should copy it first
+        return G.view(sub)
 
     # Graph, Node[] | str[], Node[] | str[]
 
@@ -400,26 +399,38 @@ class GraphUtils():
         for node in underlineExcept:
             underExcept[node['name']] = True
 
-        graph = G.copy()
+        # only the edges incident to the transformed nodes can be removed
+        if G.nx.is_directed():
+            edges = []
 
-        edgesToRemove = []
+            for name in filter(G.hasNode, over):
+                edges.extend(G.nx.in_edges(name, data = 'type_', default = directedEdgeType.id_))
+                edges.extend(G.nx.out_edges(name, data = 'type_', default = directedEdgeType.id_))
 
-        for edge in graph.edges:
-            if edge['to_'] in over and edge['from_'] not in overExcept:
-                edgesToRemove.append(edge)
+            for name in filter(G.hasNode, under):
+                edges.extend(G.nx.out_edges(name, data = 'type_', default = directedEdgeType.id_))
+        else:
+            edges = G.nx.edges(data = 'type_', default = directedEdgeType.id_)
+
+        edgesToRemove = dict()
+
+        for (from_, to_, type_) in edges:
+            if to_ in over and from_ not in overExcept:
+                edgesToRemove[(from_, to_)] = True
                 continue
 
             if (
-                (edge['type_'] == directedEdgeType.id_ and edge['from_']
-                 in under and edge['to_'] not in underExcept)
-                or (edge['type_'] == bidirectedEdgeType.id_ and edge['from_'] in over)
+                (type_ == directedEdgeType.id_ and from_
+                 in under and to_ not in underExcept)
+                or (type_ == bidirectedEdgeType.id_ and from_ in over)
             ):
-                edgesToRemove.append(edge)
+                edgesToRemove[(from_, to_)] = True
                 continue
 
-        graph.deleteEdges(edgesToRemove)
-
-        return graph
+        # the transformed graph is a view that hides the removed edges
+        # unlike a copy, it follows later changes of G (see Graph.view), but the edges it hides are
+        # those found now, so callers that change G and still need the transformed graph should copy it first
+        return G.view(None, edgesToRemove)
 
     # Graph, Node[], Node[]
     # Graph
@@ -453,6 +464,9 @@ class GraphUtils():
 
     @staticmethod
     def moralize(G):
+        if isinstance(G, CompactGraph):
+            return G.moralize()
+
         graph = G.copy()
 
         # convert all edges to undirected
@@ -524,27 +538,11 @@ class GraphUtils():
 
     @staticmethod
     def cCompDecomposition(G, sortNodesBeforeOrdering=False):
-        assignment = {}
-        number = 0
-        decomp = []
-        V = GraphUtils.topoSort(G, sortNodesBeforeOrdering)
-
-        for node in V:
-            if node['name'] not in assignment:
-                # decomp[number] = []
-                decomp.append([])
-                assignment[node['name']] = number
-
-                reachable = GraphUtils.reach(
-                    node, G, bidirectedEdgeType, Direction.both)
-
-                for rNode in reachable:
-                    assignment[rNode['name']] = number
-                    decomp[number].append(rNode)
-
-                number = number + 1
+        if isinstance(G, CompactGraph):
+            return list(map(G.toNodes, G.cComponents(sortNodesBeforeOrdering)))
 
-        return decomp
+        # the graph caches its c-components until it changes
+        return list(map(G.nodesFromNames, G.cComponentNames(sortNodesBeforeOrdering)))
 
     @staticmethod
     def hasCycles(G):
@@ -919,10 +917,16 @@ class GraphUtils():
 
     @staticmethod
     def getNodeByName(name, G):
-        if not name or not G or not G.nodes:
+        if not name or not G:
             return None
 
-        return next((n for n in G.nodes if GraphUtils.correctNodeName(n['name']) == GraphUtils.correctNodeName(name)), None)
+        # the first node with a matching name
+        names = G.matchingNames(name)
+
+        if len(names) == 0:
+            return None
+
+        return G.nodesFromNames([next(iter(names))])[0]
 
     # str | str[], Graph
     # Node
@@ -933,31 +937,17 @@ class GraphUtils():
             return []
 
         names = ou.makeArray(names)
-        dNames = dict()
-
-        for name in names:
-            if isinstance(name, str):
-                dNames[GraphUtils.correctNodeName(name)] = False
-            else:
-                v = name
-                dNames[GraphUtils.correctNodeName(v['name'])] = False
-
-        for node in G.nodes:
-            if GraphUtils.correctNodeName(node['name']) in dNames:
-                dNames[GraphUtils.correctNodeName(node['name'])] = node
-
         nodes = []
 
         for name in names:
-            actualName = ''
+            if not isinstance(name, str):
+                name = name['name']
 
-            if isinstance(name, str):
-                actualName = GraphUtils.correctNodeName(name)
-            else:
-                actualName = GraphUtils.correctNodeName(node['name'])
+            # the last node with a matching name
+            matching = G.matchingNames(name)
 
-            if actualName in dNames and dNames[actualName] is not False:
-                nodes.append(dNames[actualName])
+            if len(matching) > 0:
+                nodes.append(G.nodesFromNames([next(reversed(matching))])[0])
 
         return nodes
 
@@ -966,7 +956,7 @@ class GraphUtils():
 
     @staticmethod
     def getEdgeByName(from_, to_, G, type_=None):
-        if not G or not G.edges:
+        if not G:
             return None
 
         fromNode = GraphUtils.getNodeByName(from_, G)
@@ -975,10 +965,7 @@ class GraphUtils():
         if not fromNode or not toNode:
             return None
 
-        if not type_:
-            return next((e for e in G.edges if e['from_'] == fromNode['name'] and e['to_'] == toNode['name']), None)
-        else:
-            return next((e for e in G.edges if e['from_'] == fromNode['name'] and e['to_'] == toNode['name'] and e['type_'] == type_.id_), None)
+        return G.getEdge(fromNode['name'], toNode['name'], type_.id_ if type_ else None)
 
     @staticmethod
     def hasEdge(from_, to_, G, type=None):
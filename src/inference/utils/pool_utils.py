@@ -0,0 +1,81 @@
+import os
+import numpy as np
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+class PoolUtils():
+    """
+    Runs the work of a single call across a pool of processes. What every task needs
+    (e.g., the graph) is sent to each worker once, as its state, when the worker starts;
+    a task is then function(*state, *args) for its own args.
+
+    The state and the functions are pickled, so they must be importable (module functions
+    or static methods, no lambdas) for pools that spawn their workers instead of forking.
+    """
+
+    # any[], int
+    # any[][]
+    @staticmethod
+    def split(items, parts):
+        # consecutive chunks of about the same size, at most parts of them and none empty
+        items = list(items)
+        bounds = np.linspace(0, len(items), min(parts, len(items)) + 1).astype(int)
+
+        return [items[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    # int, tuple
+    # ProcessPoolExecutor
+    @staticmethod
+    def pool(processes, state=()):
+        return ProcessPoolExecutor(processes, initializer=initWorker, initargs=(state,))
+
+    # ProcessPoolExecutor, function, Iterable[tuple], int
+    # Iterator[Any]
+    @staticmethod
+    def imap(pool, function, args, ahead=None):
+        # the results of function(*state, *arg) for every arg, in the order of args
+        # tasks are submitted as the results are consumed, at most ahead of them (one per CPU by default)
+        # beyond the one waited for, so that stopping early leaves the rest of args alone
+        ahead = ahead if ahead is not None else os.cpu_count() or 1
+        pending = deque()
+
+        try:
+            for arg in args:
+                pending.append(pool.submit(callInWorker, function, arg))
+
+                if len(pending) > ahead:
+                    yield pending.popleft().result()
+
+            while len(pending) > 0:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    # function, any[], int, tuple, tuple
+    # Any[]
+    @staticmethod
+    def mapChunks(function, items, processes=None, state=(), args=()):
+        # function(*state, chunk, *args) for consecutive chunks of items, one per process, in order
+        # without processes (or with fewer than two items) the whole of items is a single chunk run here
+        items = list(items)
+
+        if processes is None or processes == 1 or len(items) < 2:
+            return [function(*state, items, *args)]
+
+        chunks = PoolUtils.split(items, processes)
+
+        with PoolUtils.pool(processes, state) as pool:
+            return list(PoolUtils.imap(pool, function, map(lambda chunk: (chunk,) + tuple(args), chunks), len(chunks)))
+
+
+stateInWorker = ()
+
+def initWorker(state):
+    global stateInWorker
+    stateInWorker = state
+
+def callInWorker(function, args):
+    return function(*stateInWorker, *args)
@@ -14,6 +14,17 @@ class SetUtils():
     def difference(a, b, iteratee=None):
         if iteratee is None:
             return pydash.arrays.difference(a, b)
+        elif isinstance(iteratee, str):
+            # same result as difference_by, with the keys of b hashed once
+            if not b:
+                return a[:]
+
+            keys = dict()
+
+            for item in b:
+                keys[SetUtils.property(item, iteratee)] = True
+
+            return [item for item in a if SetUtils.property(item, iteratee) not in keys]
         else:
             return pydash.arrays.difference_by(a, b, iteratee=iteratee)
 
@@ -21,9 +32,39 @@ class SetUtils():
     def intersection(a, b, iteratee=None):
         if iteratee is None:
             return pydash.arrays.intersection(a, b)
+        elif isinstance(iteratee, str):
+            # same result as intersection_by, with the keys of b hashed once instead of
+            # compared against every item of a
+            if not a or not b:
+                return []
+
+            keys = dict()
+
+            for item in b:
+                keys[SetUtils.property(item, iteratee)] = True
+
+            result = []
+            seen = dict()
+
+            for item in a:
+                key = SetUtils.property(item, iteratee)
+
+                if key in keys and key not in seen:
+                    seen[key] = True
+                    result.append(item)
+
+            return result
         else:
             return pydash.arrays.intersection_by(a, b, iteratee=iteratee)
 
+    @staticmethod
+    def property(item, name):
+        # plain dictionaries (nodes, edges) skip the path parsing of pydash
+        if isinstance(item, dict) and name in item:
+            return item[name]
+
+        return pydash.objects.get(item, name)
+
     @staticmethod
     def belongs(a, b, comparator=None):
         if comparator is not None:
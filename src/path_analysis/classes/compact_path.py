@@ -0,0 +1,61 @@
+from array import array
+
+from src.path_analysis.classes.path import Path
+from src.path_analysis.classes.path_edge import PathEdge
+from src.path_analysis.classes.direction import Direction as PathDirection
+
+
+class CompactPath():
+    """
+    Path stored as the ids of its edges in an edge table shared by all the paths
+    of a search, plus a bitmask where bit i is set when the i-th edge is traversed
+    in reverse. Path and PathEdge objects are only built on demand.
+    """
+
+    __slots__ = ('table', 'ids', 'reversedMask', 'blockedBy')
+
+    # Edge[], int[], int, str
+    def __init__(self, table, ids, reversedMask = 0, blockedBy = None):
+        self.table = table
+        self.ids = array('i', ids)
+        self.reversedMask = reversedMask
+        self.blockedBy = blockedBy
+
+    @property
+    def length(self):
+        return len(self.ids)
+
+    # int
+    # PathEdge
+    def pathEdge(self, i):
+        direction = PathDirection.reversed if (self.reversedMask >> i) & 1 else PathDirection.directed
+
+        return PathEdge(self.table[self.ids[i]], direction)
+
+    # Path
+    def toPath(self):
+        return Path(list(map(self.pathEdge, range(self.length))), self.blockedBy)
+
+
+    # Path, Dict[(str, str, str), int], Edge[]
+    # CompactPath
+    @staticmethod
+    def fromPath(path, ids, table):
+        # ids interns the edges of the table by (from_, to_, type_) and is extended as needed
+        edgeIds = []
+        reversedMask = 0
+
+        for (i, pathEdge) in enumerate(path.edges):
+            edge = pathEdge.edge
+            key = (edge['from_'], edge['to_'], edge['type_'])
+
+            if key not in ids:
+                ids[key] = len(table)
+                table.append(edge)
+
+            edgeIds.append(ids[key])
+
+            if pathEdge.direction == PathDirection.reversed:
+                reversedMask = reversedMask | (1 << i)
+
+        return CompactPath(table, edgeIds, reversedMask, path.blockedBy)
@@ -6,13 +6,17 @@ from src.path_analysis.classes.path_edge import PathEdge
 class Path():
 
     edges = List[PathEdge]
+    # name of the node closing the path, for searches that track it
+    blockedBy = str
 
-    def __init__(self, edges = []):
+    def __init__(self, edges = [], blockedBy = None):
         if edges is None:
             self.edges = []
         else:
             self.edges = edges
 
+        self.blockedBy = blockedBy
+
     @property
     def length(self):
         return len(self.edges)
@@ -39,6 +43,7 @@ class Path():
     
     def copy(self, otherPath):
         self.edges = otherPath.edges.copy()
+        self.blockedBy = otherPath.blockedBy
 
     def push(self, edge):
         self.edges.append(edge)
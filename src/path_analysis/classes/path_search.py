@@ -1,44 +1,399 @@
 from typing import List
+from random import Random
 
 from src.graph.classes.graph import Graph
+from src.graph.classes.graph_defs import bidirectedEdgeType
 from src.path_analysis.classes.path import Path
+from src.path_analysis.classes.compact_path import CompactPath
 from src.path_analysis.classes.path_edge import PathEdge
 from src.path_analysis.classes.direction import Direction as PathDirection
 from src.inference.utils.graph_utils import compareNames
 
 from src.inference.utils.graph_utils import GraphUtils as gu
 from src.inference.utils.set_utils import SetUtils as su
+from src.inference.utils.pool_utils import PoolUtils as plu
 
 
 class PathSearch():
 
     backtrack = 1
     forward = 0
+    depthFirst = 'depth-first'
+    shortestFirst = 'shortest-first'
     paths = List[Path]
     graph = Graph
     # sources = List[Node]
     # targets = List[Node]
     # edgeFilter: (graph: Graph, node: Node, previousInPath: PathEdge) => Edge[]
+    # edgeFilterState: (previousInPath: PathEdge) => the part of previousInPath that edgeFilter depends on
     # pathFilter: (path: Path) => boolean
+    # blockingNode: (previousInPath: PathEdge, pathEdge: PathEdge) => name of the node closing the path between the two edges, or None
+    # maxLength: number of edges above which paths are not followed (None for no bound)
+    # order: depthFirst, or shortestFirst to find the paths by increasing length (iterative deepening)
 
     def __init__(self, graph, sources = [], targets = []):
         self.graph = graph
         self.sources = sources
         self.targets = targets
         self.edgeFilter = filterAllEdges
+        self.edgeFilterState = None
         self.pathFilter = filterAllPaths
+        self.blockingNode = None
+        self.maxLength = None
+        self.order = PathSearch.depthFirst
 
 
-    # Path, number
+    # Path, number, int
     # Path[]
-    def findPaths(self, lastPath, limit):
-        
+    def findPaths(self, lastPath, limit, processes = None):
         self.paths = []
+
+        if limit <= 0:
+            return self.paths
+
+        if processes is None or processes == 1:
+            paths = self.iterPaths(lastPath)
+        else:
+            paths = self.iterPathsInPool(lastPath, processes, limit)
+
+        for path in paths:
+            self.savePath(path)
+            limit = limit - 1
+
+            if limit <= 0:
+                break
+
+        return self.paths
+
+
+    # Path | CompactPath | Cursor
+    # Iterator[Path]
+    def iterPaths(self, lastPath = None):
+        # yields the paths one at a time, in the same order as findPaths
+        # the enumeration resumes right after lastPath, which may also be a cursor (see toCursor)
+        for currentPath in self.__paths(lastPath):
+            yield PathSearch.keepPath(currentPath)
+
+
+    # Path | CompactPath | Cursor
+    # Iterator[CompactPath]
+    def iterCompactPaths(self, lastPath = None):
+        # same as iterPaths, but the paths share a single table of edges
+        ids = dict()
+        table = []
+
+        for currentPath in self.__paths(lastPath):
+            yield PathSearch.keepPath(currentPath, ids, table)
+
+
+    # Path | CompactPath | Cursor, int, number, boolean
+    # Iterator[Path | CompactPath]
+    def iterPathsInPool(self, lastPath = None, processes = None, limit = None, compact = False):
+        # same as iterPaths (or iterCompactPaths), but the search is split by source and first edge
+        # and the parts are enumerated in a pool of processes, then yielded back in order as they complete,
+        # with only a few parts searched ahead of the one being yielded
+        # the search is sent to the workers once, so its filters must be picklable (functions, not lambdas);
+        # its graph is pickled as a copy when it is a view (see Graph.view)
+        lastPath = self.toPath(lastPath)
+        allPrefixes = self.prefixes()
+        resumed = lastPath is not None and lastPath.length > 0
+        byLength = self.order == PathSearch.shortestFirst
+        length = None
+        pool = None
+        ids = dict() if compact else None
+        table = [] if compact else None
+
+        if byLength:
+            length = lastPath.length if resumed else 1
+
+        try:
+            # a single pass, or one pass per length when searching the shortest paths first
+            while self.maxLength is None or length is None or length <= self.maxLength:
+                prefixes = allPrefixes
+                # after resuming, the paths cut before lastPath are not known, so go on anyway
+                isCut = resumed
+
+                if resumed:
+                    # finish the part lastPath belongs to here, and only send the parts after it to the pool
+                    source = self.sourceByName(lastPath.edges[0].source)
+                    sourceIdx = len(self.sources) - 1 - self.sources[::-1].index(source)
+                    prefix = (sourceIdx, PathSearch.indexOf(self.incidentEdges(source, None), lastPath.edges[0]))
+
+                    if prefix not in prefixes:
+                        yield from (self.iterCompactPaths(lastPath) if compact else self.iterPaths(lastPath))
+                        return
+
+                    for currentPath in self.__search(lastPath, prefix, length):
+                        yield PathSearch.keepPath(currentPath, ids, table)
+
+                    prefixes = prefixes[prefixes.index(prefix) + 1:]
+
+                if len(prefixes) > 0:
+                    if pool is None:
+                        pool = plu.pool(processes, (self,))
+
+                    args = map(lambda prefix: (prefix, limit, length), prefixes)
+
+                    for (paths, prefixCut) in plu.imap(pool, PathSearch.findPrefixPaths, args, processes):
+                        isCut = isCut or prefixCut
+
+                        for path in paths:
+                            yield path if compact else path.toPath()
+
+                if not byLength or not isCut:
+                    return
+
+                lastPath = None
+                resumed = False
+                length = length + 1
+        finally:
+            if pool is not None:
+                pool.shutdown(wait = True, cancel_futures = True)
+
+
+    # (int, int)[]
+    def prefixes(self):
+        # (source index, edge index) of every first edge in the order the search follows them
+        prefixes = []
+        sourceIdx = -1
+
+        while self.edgeFilter and len(self.sources) > sourceIdx + 1:
+            source = self.sources[sourceIdx + 1]
+
+            if source:
+                for edgeIdx in range(len(self.incidentEdges(source, None))):
+                    prefixes.append((sourceIdx + 1, edgeIdx))
+
+            # the search moves on from the last occurrence of the source
+            sourceIdx = len(self.sources) - 1 - self.sources[::-1].index(source)
+
+        return prefixes
+
+
+    # (int, int), number, int
+    # (CompactPath[], boolean)
+    def findPrefixPaths(self, prefix, limit = None, length = None):
+        # the paths starting with the given source and first edge (see prefixes), of the given length if any
+        # and whether some path was cut at that length
+        ids = dict()
+        table = []
+        paths = []
+        cut = dict()
+
+        for currentPath in self.__search(None, prefix, length, cut):
+            paths.append(PathSearch.keepPath(currentPath, ids, table))
+
+            if limit is not None and len(paths) >= limit:
+                break
+
+        return (paths, 'cut' in cut)
+
+
+    # number, boolean, int, int
+    # Dict[str, Any]
+    def countPaths(self, budget = None, byNode = False, samples = 1000, seed = 0):
+        # number of paths the search would find, without keeping any of them
+        # the paths are counted one by one up to budget; past it, the count is estimated by sampling
+        # byNode also counts the paths going through every intermediate node
+        nodeCounts = dict()
+        count = self.__countPaths(budget, nodeCounts if byNode else None)
+
+        if count is not None:
+            return {'count': count, 'exact': True, 'nodes': nodeCounts}
+
+        count = budget
+
+        # the paths already counted are a lower bound for the estimate
+        estimate = self.estimatePaths(samples, seed)
+        estimatedNodes = dict()
+
+        if byNode:
+            for name in su.union(list(nodeCounts), list(estimate['nodes'])):
+                estimatedNodes[name] = max(nodeCounts.get(name, 0), round(estimate['nodes'].get(name, 0)))
+
+        return {'count': max(count, round(estimate['count'])), 'exact': False, 'nodes': estimatedNodes}
+
+
+    # number, Dict
+    # int
+    def __countPaths(self, budget, nodeCounts):
+        # the paths __search would yield, counted by walking the cached incident edges by index
+        # None once more than budget paths are found
+        incident = dict()
+        pathEdges = dict()
+        nodes = dict()
+        count = 0
+
+        for (sourceIdx, edgeIdx) in self.prefixes():
+            source = self.sources[sourceIdx]
+            path = Path([])
+            blockers = []
+            visited = {source['name']: True}
+            # the edges that may follow each edge of the path, and the index of the next one to try
+            # the first edge is fixed by the prefix
+            frames = [[self.pathEdges(source, None, incident, pathEdges), edgeIdx, edgeIdx + 1]]
+
+            while len(frames) > 0:
+                frame = frames[-1]
+                edges = frame[0]
+
+                while frame[1] < frame[2] and edges[frame[1]].target in visited:
+                    frame[1] = frame[1] + 1
+
+                if frame[1] >= frame[2]:
+                    # no more edges after this one, backtrack to the one before
+                    frames.pop()
+
+                    if len(frames) > 0:
+                        lastEdge = path.pop()
+                        blockers.pop()
+                        del visited[lastEdge.target]
+
+                    continue
+
+                lastEdge = edges[frame[1]]
+                frame[1] = frame[1] + 1
+                path.push(lastEdge)
+                blockers.append(self.blockerAt(path, path.length - 1, blockers))
+                node = self.nodeByName(lastEdge.target, nodes)
+
+                if self.isTarget(node):
+                    isBlocked = self.blockingNode is None or blockers[-1] is not None
+
+                    if isBlocked and (not self.pathFilter or self.pathFilter(path)):
+                        if budget is not None and count >= budget:
+                            return None
+
+                        count = count + 1
+
+                        if nodeCounts is not None:
+                            for i in range(1, path.length):
+                                name = path.edges[i].source
+                                nodeCounts[name] = nodeCounts.get(name, 0) + 1
+                elif self.maxLength is None or path.length < self.maxLength:
+                    visited[lastEdge.target] = True
+                    nextEdges = self.pathEdges(node, lastEdge, incident, pathEdges)
+                    frames.append([nextEdges, 0, len(nextEdges)])
+                    continue
+
+                path.pop()
+                blockers.pop()
+
+        return count
+
+
+    # int, int
+    # Dict[str, Any]
+    def estimatePaths(self, samples = 1000, seed = 0):
+        # Knuth's estimator: random walks down the search tree, each weighted by the product of
+        # the number of choices it had, average to the number of paths the search would find
+        rng = Random(seed)
+        prefixes = self.prefixes()
+        incident = dict()
+        nodes = dict()
+        total = 0
+        nodeTotals = dict()
+
+        for i in range(samples if len(prefixes) > 0 else 0):
+            (sourceIdx, edgeIdx) = prefixes[rng.randrange(len(prefixes))]
+            source = self.sources[sourceIdx]
+            edge = self.incidentEdges(source, None, incident)[edgeIdx]
+            direction = PathDirection.reversed if edge['to_'] == source['name'] else PathDirection.directed
+
+            path = Path([PathEdge(edge, direction)])
+            blockers = [None]
+            visited = dict()
+            weight = len(prefixes)
+
+            while True:
+                lastEdge = path.lastEdge
+                visited[lastEdge.source] = True
+                node = self.nodeByName(lastEdge.target, nodes)
+
+                if self.isTarget(node):
+                    isBlocked = self.blockingNode is None or blockers[-1] is not None
+
+                    if isBlocked and (not self.pathFilter or self.pathFilter(path)):
+                        total = total + weight
+
+                        for j in range(1, path.length):
+                            name = path.edges[j].source
+                            nodeTotals[name] = nodeTotals.get(name, 0) + weight
+
+                    break
+
+                if self.maxLength is not None and path.length >= self.maxLength:
+                    break
+
+                choices = []
+                index = 0
+
+                while index is not None:
+                    (index, nextEdge) = self.nextEdge(node, lastEdge, index, visited, incident)
+
+                    if nextEdge is not None:
+                        choices.append(nextEdge)
+                        index = index + 1
+
+                if len(choices) == 0:
+                    break
+
+                weight = weight * len(choices)
+                path.push(choices[rng.randrange(len(choices))])
+                blockers.append(self.blockerAt(path, path.length - 1, blockers))
+
+        if samples <= 0:
+            return {'count': 0, 'nodes': dict()}
+
+        return {'count': total / samples, 'nodes': dict(map(lambda item: (item[0], item[1] / samples), nodeTotals.items()))}
+
+
+    # Path | CompactPath | Cursor
+    # Iterator[Path]
+    def __paths(self, lastPath):
+        if self.order != PathSearch.shortestFirst:
+            yield from self.__search(lastPath)
+            return
+
+        # iterative deepening: a bounded search per length, for as long as some path was cut
+        lastPath = self.toPath(lastPath)
+        resumed = lastPath is not None and lastPath.length > 0
+        length = lastPath.length if resumed else 1
+
+        while self.maxLength is None or length <= self.maxLength:
+            cut = dict()
+
+            yield from self.__search(lastPath, None, length, cut)
+
+            # after resuming, the paths cut before lastPath are not known, so go on anyway
+            if not resumed and 'cut' not in cut:
+                return
+
+            lastPath = None
+            resumed = False
+            length = length + 1
+
+
+    # Path | CompactPath | Cursor, (int, int), int, Dict
+    # Iterator[Path]
+    def __search(self, lastPath, prefix = None, length = None, cut = None):
+        # the path yielded is the one being searched, it changes as soon as the search resumes
+        # with a prefix, only the paths starting with that source and first edge are searched
+        # with a length, only the paths of that length are reported, and cut records if longer ones were left out
+        lastPath = self.toPath(lastPath)
+        bound = self.maxLength if length is None else length
+
         mode = self.forward
         lastSource = None
         visited = dict()
+        incident = dict()
+        nodes = dict()
         
         currentPath = Path([])
+        # position of every edge of the current path in the incident edges it was picked from
+        cursors = []
+        # first node closing the current path up to each of its edges, when blockingNode is set
+        blockers = []
 
         if lastPath is not None and lastPath.length > 0:
             # make a copy of the passed path
@@ -48,12 +403,29 @@ class PathSearch():
             for edge in currentPath.edges:
                 visited[edge.target] = True
 
-            lastSource = currentPath.edges[0].source
+            previousInPath = None
+
+            for edge in currentPath.edges:
+                edges = self.incidentEdges(self.nodeByName(edge.source, nodes), previousInPath, incident)
+                cursors.append(PathSearch.indexOf(edges, edge))
+                blockers.append(self.blockerAt(currentPath, len(blockers), blockers))
+                previousInPath = edge
+
+            lastSource = self.sourceByName(currentPath.edges[0].source)
             visited[currentPath.edges[0].source] = True
             visited[currentPath.lastEdge.target] = True
             mode = self.backtrack
+        elif prefix is not None:
+            (sourceIdx, edgeIdx) = prefix
+            lastSource = self.sources[sourceIdx]
+            edge = self.incidentEdges(lastSource, None, incident)[edgeIdx]
+            direction = PathDirection.reversed if edge['to_'] == lastSource['name'] else PathDirection.directed
+
+            currentPath.push(PathEdge(edge, direction))
+            cursors.append(edgeIdx)
+            blockers.append(None)
 
-        while limit > 0:
+        while True:
             if mode == self.forward:
                 if currentPath.length == 0:
                     # if the path is empty
@@ -67,19 +439,32 @@ class PathSearch():
                     visited[lastEdge.source] = True
 
                     # have we reached a target?
-                    if self.isTarget(gu.getNodeByName(lastEdge.target, self.graph)):
+                    if self.isTarget(self.nodeByName(lastEdge.target, nodes)):
                         # target reached
-                        if not self.pathFilter or self.pathFilter(currentPath):
-                            self.savePath(currentPath)
-                            limit = limit - 1
+                        # with blockingNode, only the paths closed somewhere are reported
+                        isBlocked = self.blockingNode is None or blockers[-1] is not None
+                        isReported = isBlocked and (length is None or currentPath.length == length)
+
+                        if isReported and (not self.pathFilter or self.pathFilter(currentPath)):
+                            currentPath.blockedBy = blockers[-1]
+
+                            yield currentPath
+
+                        mode = self.backtrack
+                    elif bound is not None and currentPath.length >= bound:
+                        # the path is as long as allowed, note whether it could have gone further
+                        if cut is not None and self.nextEdge(self.nodeByName(lastEdge.target, nodes), lastEdge, 0, visited, incident)[1] is not None:
+                            cut['cut'] = True
 
                         mode = self.backtrack
                     else:
                         # can we move forward?
-                        nextEdge = self.getEdgeAfter(gu.getNodeByName(lastEdge.target, self.graph), lastEdge, None, visited)
+                        (index, nextEdge) = self.nextEdge(self.nodeByName(lastEdge.target, nodes), lastEdge, 0, visited, incident)
                         
                         if nextEdge is not None:
                             currentPath.push(nextEdge)
+                            cursors.append(index)
+                            blockers.append(self.blockerAt(currentPath, currentPath.length - 1, blockers))
                         else:
                             # backtrack if no further advance can be made in this path
                             mode = self.backtrack
@@ -102,19 +487,26 @@ class PathSearch():
                         lastSource = self.sources[sourceIdx + 1]
 
                         # does it have outgoing edges?
-                        nextEdge = self.getEdgeAfter(lastSource, None, None, visited)
+                        (index, nextEdge) = self.nextEdge(lastSource, None, 0, visited, incident)
                         
                         if nextEdge is not None:
                             currentPath.push(nextEdge)
+                            cursors.append(index)
+                            blockers.append(None)
                             mode = self.forward
 
                         # if it does not just let the next iteration to pick the next source
                     else:
                         # no more source, we are done
-                        break
+                        return
+                elif prefix is not None and currentPath.length == 1:
+                    # the first edge is fixed, we are done
+                    return
                 else:
                     # path not empty, get and remove the last edge
                     lastEdge = currentPath.pop()
+                    lastIndex = cursors.pop()
+                    blockers.pop()
 
                     # unmark the last node
                     if lastEdge.target in visited:
@@ -124,17 +516,82 @@ class PathSearch():
                     previousInPath = currentPath.lastEdge
 
                     # determine next edge to try
-                    source = gu.getNodeByName(lastEdge.source, self.graph)
-                    nextEdge = self.getEdgeAfter(source, previousInPath, lastEdge, visited)
+                    source = self.nodeByName(lastEdge.source, nodes)
+                    (index, nextEdge) = self.nextEdge(source, previousInPath, lastIndex + 1, visited, incident)
                     
                     if nextEdge is not None:
                         # if there is a next edge add it to the path
                         currentPath.push(nextEdge)
+                        cursors.append(index)
+                        blockers.append(self.blockerAt(currentPath, currentPath.length - 1, blockers))
                         mode = self.forward
 
                     # if there is no next edge let the next iteration pick a new source
 
-        return self.paths
+
+    # Path, Dict[(str, str, str), int], Edge[]
+    # Path | CompactPath
+    @staticmethod
+    def keepPath(path, ids = None, table = None):
+        # a copy of the path being searched, compact when an edge table is given
+        if table is not None:
+            return CompactPath.fromPath(path, ids, table)
+
+        copy = Path()
+        copy.copy(path)
+
+        return copy
+
+
+    # Path | CompactPath
+    # Cursor
+    @staticmethod
+    def toCursor(path):
+        # a plain (JSON serializable) record of the path, to resume the enumeration from it later
+        if path is None:
+            return None
+
+        if isinstance(path, CompactPath):
+            path = path.toPath()
+
+        return list(map(lambda e: {'from_': e.edge['from_'], 'to_': e.edge['to_'], 'type_': e.edge['type_'], 'direction': e.direction.name}, path.edges))
+
+
+    # Path | CompactPath | Cursor
+    # Path
+    def toPath(self, path):
+        if isinstance(path, CompactPath):
+            return path.toPath()
+        elif path is not None and not isinstance(path, Path):
+            return self.fromCursor(path)
+
+        return path
+
+
+    # Cursor
+    # Path
+    def fromCursor(self, cursor):
+        path = Path([])
+
+        for entry in cursor:
+            edge = self.graph.getEdge(entry['from_'], entry['to_'], entry['type_'])
+
+            if edge is None:
+                raise Exception('The cursor refers to an edge ' + entry['from_'] + ' - ' + entry['to_'] + ' not in the graph.')
+
+            path.push(PathEdge(edge, PathDirection[entry['direction']]))
+
+        return path
+
+
+    # str
+    # Node
+    def sourceByName(self, name):
+        for source in self.sources[::-1]:
+            if source['name'] == name:
+                return source
+
+        raise Exception('The path does not start at a source of the search: ' + name + '.')
 
 
     # Node, PathEdge, PathEdge, Dict
@@ -142,48 +599,108 @@ class PathSearch():
     def getEdgeAfter(self, node, previousInPath, previouslySelected = None, visited = dict()):
         if not self.edgeFilter or not node:
             return None
-        
-        edges = self.edgeFilter(self.graph, node, previousInPath)
+
         index = 0
-        
-        if len(edges) == 0:
-            return None
 
         if previouslySelected is not None:
-            # move the iterator right to the previous edge
-            # while edges[index] != previouslySelected.edge:
-            prevEdge = previouslySelected.edge
-            currEdge = edges[index]
+            # move right after the previous edge
+            index = PathSearch.indexOf(self.incidentEdges(node, previousInPath), previouslySelected) + 1
 
-            # while index < len(edges) - 1 and not (currEdge['from_'] == prevEdge['from_'] and currEdge['to_'] == prevEdge['to_'] and currEdge['type_'] == prevEdge['type_']):
-            while index < len(edges) and not (currEdge['from_'] == prevEdge['from_'] and currEdge['to_'] == prevEdge['to_'] and currEdge['type_'] == prevEdge['type_']):
-                index = index + 1
+        return self.nextEdge(node, previousInPath, index, visited)[1]
 
-                if index < len(edges):
-                    currEdge = edges[index]
 
-            # move onto the next one
-            index = index + 1
+    # Node, PathEdge, int, Dict, Dict
+    # (int, PathEdge)
+    def nextEdge(self, node, previousInPath, index, visited, incident = None):
+        # first edge at or after index that leads to a non-visited node, along with its index
+        if not self.edgeFilter or not node:
+            return (None, None)
+
+        edges = self.incidentEdges(node, previousInPath, incident)
+
+        while index < len(edges):
+            edge = edges[index]
+            isReversed = edge['to_'] == node['name']
+            nodeName = edge['from_'] if isReversed else edge['to_']
+
+            if nodeName not in visited:
+                return (index, PathEdge(edge, PathDirection.reversed if isReversed else PathDirection.directed))
 
-        if index >= len(edges):
-            return None
-        
-        # move forward up to a non-visited edge
-        nodeName = edges[index]['from_'] if edges[index]['to_'] == node['name'] else edges[index]['to_']
-        
-        # while index < len(edges) - 1 and nodeName in visited:
-        while index < len(edges) and nodeName in visited:
             index = index + 1
 
-            if index < len(edges):
-                nodeName = edges[index]['from_'] if edges[index]['to_'] == node['name'] else edges[index]['to_']
-        
-        if index >= len(edges):
-            return None
+        return (None, None)
+
+
+    # Node, PathEdge, Dict, Dict
+    # PathEdge[]
+    def pathEdges(self, node, previousInPath, incident, pathEdges):
+        # the incident edges of node as path edges leaving it, built once per list of incident edges
+        if not self.edgeFilter or not node:
+            return []
+
+        edges = self.incidentEdges(node, previousInPath, incident)
+        key = (id(edges), node['name'])
+
+        if key not in pathEdges or pathEdges[key][0] is not edges:
+            pathEdges[key] = (edges, list(map(lambda edge: PathEdge(edge, PathDirection.reversed if edge['to_'] == node['name'] else PathDirection.directed), edges)))
+
+        return pathEdges[key][1]
+
+
+    # Node, PathEdge, Dict
+    # Edge[]
+    def incidentEdges(self, node, previousInPath, incident = None):
+        # the edges returned by edgeFilter are computed once per node and state of the previous edge
+        # a filter without an edgeFilterState may depend on anything, so it is not cached
+        if incident is None:
+            return self.edgeFilter(self.graph, node, previousInPath)
+
+        if self.edgeFilter is filterAllEdges:
+            key = node['name']
+        elif self.edgeFilterState is not None:
+            key = (node['name'], self.edgeFilterState(previousInPath))
         else:
-            direction = PathDirection.reversed if edges[index]['to_'] == node['name'] else PathDirection.directed
+            return self.edgeFilter(self.graph, node, previousInPath)
+
+        if key not in incident:
+            incident[key] = self.edgeFilter(self.graph, node, previousInPath)
 
-            return PathEdge(edges[index], direction)
+        return incident[key]
+
+
+    # str, Dict
+    # Node
+    def nodeByName(self, name, nodes):
+        if name not in nodes:
+            nodes[name] = gu.getNodeByName(name, self.graph)
+
+        return nodes[name]
+
+
+    # Edge[], PathEdge
+    # int
+    @staticmethod
+    def indexOf(edges, pathEdge):
+        edge = pathEdge.edge
+
+        for index in range(len(edges)):
+            if edges[index]['from_'] == edge['from_'] and edges[index]['to_'] == edge['to_'] and edges[index]['type_'] == edge['type_']:
+                return index
+
+        return len(edges)
+
+
+    # Path, int, str[]
+    # str
+    def blockerAt(self, path, i, blockers):
+        # first node closing the path up to its i-th edge, given the ones up to the previous edges
+        if self.blockingNode is None or i == 0:
+            return None
+
+        if blockers[i - 1] is not None:
+            return blockers[i - 1]
+
+        return self.blockingNode(path.edges[i - 1], path.edges[i])
 
 
     # Node
@@ -196,13 +713,18 @@ class PathSearch():
 
 
     def savePath(self, path):
-        pathObj = Path()
-        pathObj.copy(path)
-        self.paths.append(pathObj)
+        self.paths.append(path)
 
 
 def filterAllPaths(path):
     return True
 
 def filterAllEdges(graph, node, previous):
-    return gu.getOutgoing(node, graph) + gu.getIncoming(node, graph)
\ No newline at end of file
+    return gu.getOutgoing(node, graph) + gu.getIncoming(node, graph)
+
+def enteredThroughArrowhead(previous):
+    # state of the previous edge for filters following the d-separation rules
+    if previous is None:
+        return None
+
+    return previous.edge['type_'] == bidirectedEdgeType.id_ or previous.direction == PathDirection.directed
\ No newline at end of file
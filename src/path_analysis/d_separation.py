@@ -1,8 +1,12 @@
+import numpy as np
+from functools import partial
+
 from src.graph.classes.graph_defs import directedEdgeType, bidirectedEdgeType
 from src.path_analysis.classes.direction import Direction as PathDirection
-from src.path_analysis.classes.path_search import PathSearch
+from src.path_analysis.classes.path_search import PathSearch, enteredThroughArrowhead
 
 from src.inference.utils.graph_utils import GraphUtils as gu
+from src.inference.utils.pool_utils import PoolUtils as plu
 from src.common.object_utils import ObjectUtils as ou
 
 
@@ -16,57 +20,359 @@ class DSeparation():
         Y = ou.makeArray(Y)
         Z = ou.makeArray(Z)
 
-        search = DSeparation.getPathSearch(G, X, Y, Z, 'd-con')
-
-        if search is None:
+        if len(X) == 0 or len(Y) == 0 or (len(X) == 1 and X[0] is None) or (len(Y) == 1 and Y[0] is None):
             return True
 
-        return len(search.findPaths(None, 1)) == 0
+        # the reachability test only knows about directed and bidirected edges
+        if len(G.otherEdgeTypes()) > 0:
+            search = DSeparation.getPathSearch(G, X, Y, Z, 'd-con')
 
-    # Path[]
+            return len(search.findPaths(None, 1)) == 0
+
+        observed = DSeparation.getObservedVariables(G, Z)
+
+        return not DSeparation.isDConnected(G, X, Y, observed['observed'], observed['ancestors'])
+
+    # Graph, (Node[], Node[], Node[])[]
+    # boolean[]
 
     @staticmethod
-    def findDConnectedPaths(G, X, Y, Z):
-        X = ou.makeArray(X)
-        Y = ou.makeArray(Y)
+    def testMany(G, queries):
+        # answers every (X, Y, Z) query against the same graph: the ancestors of each distinct Z
+        # are computed once, and queries sharing Z and their sources share a single sweep
+        queries = list(map(lambda query: tuple(map(ou.makeArray, query)), queries))
+        results = np.ones(len(queries), dtype=bool)
+
+        if len(queries) == 0:
+            return results
+
+        fallback = len(G.otherEdgeTypes()) > 0
+        observedByZ = dict()
+        sweepsByZ = dict()
+        counts = dict()
+
+        for i, (X, Y, Z) in enumerate(queries):
+            if len(X) == 0 or len(Y) == 0 or (len(X) == 1 and X[0] is None) or (len(Y) == 1 and Y[0] is None):
+                queries[i] = None
+                continue
+
+            key = frozenset(map(lambda n: n['name'], Z))
+
+            if key not in observedByZ:
+                observedByZ[key] = None if fallback else DSeparation.getObservedVariables(G, Z)
+                sweepsByZ[key] = dict()
+
+            # single-node queries are symmetric when neither end is observed,
+            # so the sweep can start from whichever end is shared by more queries
+            symmetric = not fallback and len(X) == 1 and len(Y) == 1 and X[0]['name'] != Y[0]['name'] and \
+                X[0]['name'] not in key and Y[0]['name'] not in key and G.hasNode(Y[0]['name'])
+
+            if symmetric:
+                for name in [X[0]['name'], Y[0]['name']]:
+                    counts[(key, name)] = counts.get((key, name), 0) + 1
+
+            queries[i] = (X, Y, Z, key, symmetric)
+
+        for i, query in enumerate(queries):
+            if query is None:
+                continue
+
+            (X, Y, Z, key, symmetric) = query
+
+            if fallback:
+                results[i] = DSeparation.test(G, X, Y, Z)
+                continue
+
+            if symmetric and counts[(key, Y[0]['name'])] > counts[(key, X[0]['name'])]:
+                (X, Y) = (Y, X)
+
+            observed = observedByZ[key]
+            results[i] = not DSeparation.isDConnected(G, X, Y, observed['observed'], observed['ancestors'], sweepsByZ[key])
+
+        return results
+
+    # Graph, Node[], Node[], ObservedNodes, ObservedNodes, Dict[frozenset, Dict[str, boolean]]
+    # boolean
+
+    @staticmethod
+    def isDConnected(G, X, Y, observed, ancOfObserved, sweeps=None):
+        # paths start at a non-observed node of X and end at any node of Y (observed or not)
+        # sweeps optionally caches the reachable nodes per set of sources under the same observed nodes
+        sources = dict()
+
+        for node in X:
+            if node['name'] not in observed and G.hasNode(node['name']):
+                sources[node['name']] = True
+
+        if sweeps is None:
+            reached = DSeparation.reachableNames(G, sources, observed, ancOfObserved)
+        else:
+            key = frozenset(sources)
+
+            if key not in sweeps:
+                sweeps[key] = DSeparation.reachableNames(G, sources, observed, ancOfObserved)
+
+            reached = sweeps[key]
+
+        for node in Y:
+            if node['name'] in reached and node['name'] not in sources:
+                return True
+
+        # a path cannot start and end at the same node
+        for node in Y:
+            if node['name'] in sources and len(sources) > 1:
+                otherSources = dict(sources)
+                del otherSources[node['name']]
+
+                if node['name'] in DSeparation.reachableNames(G, otherSources, observed, ancOfObserved):
+                    return True
+
+        return False
+
+    # Graph, str[], ObservedNodes, ObservedNodes
+    # Dict[str, boolean]
+
+    @staticmethod
+    def reachableNames(G, sources, observed, ancOfObserved):
+        # Bayes-ball: nodes reachable from the sources through a d-connecting path, in O(V + E)
+        # a node is visited at most twice: entered through an arrowhead (head) or through a tail
+        # the same rules as edgeFilterDConnectedPaths apply at every node
+        visitedHead = dict()
+        visitedTail = dict()
+        reached = dict()
+
+        # sources behave like nodes entered through a tail
+        stack = list(map(lambda name: (name, False), sources))
+
+        while len(stack) > 0:
+            (name, isHead) = stack.pop()
+            visited = visitedHead if isHead else visitedTail
+
+            if name in visited:
+                continue
+
+            visited[name] = True
+
+            isObserved = name in observed and observed[name] is not None
+            isAncOfObs = name in ancOfObserved and ancOfObserved[name] is not None
+
+            if isHead:
+                # opened v-structure, closed chain
+                if isObserved:
+                    toParents, toChildren, toSpouses = True, False, True
+                # opened v-structure, opened chain
+                elif isAncOfObs:
+                    toParents, toChildren, toSpouses = True, True, True
+                # closed v-structure, opened chain
+                else:
+                    toParents, toChildren, toSpouses = False, True, False
+            else:
+                # closed fork and chain if observed
+                toParents = toChildren = toSpouses = not isObserved
+
+            # a parent is entered through the tail of its edge, children and spouses through an arrowhead
+            if toParents:
+                for parent in G.parentNames(name):
+                    reached[parent] = True
+                    stack.append((parent, False))
+
+            if toChildren:
+                for child in G.childNames(name):
+                    reached[child] = True
+                    stack.append((child, True))
+
+            if toSpouses:
+                for spouse in G.spouseNames(name):
+                    reached[spouse] = True
+                    stack.append((spouse, True))
+
+        return reached
+
+    # Graph, Node[], int
+    # boolean[][]
+
+    @staticmethod
+    def testMatrix(G, Z=[], processes=None):
+        # d-separation given Z of every pair of nodes of G, as a V x V boolean array following G.nodes
+        # all the sources are swept at once over the arrays of the compact graph (see connectedRows);
+        # with processes, each process sweeps its share of the sources over the same compact graph
         Z = ou.makeArray(Z)
+        C = G.compact()
 
-        search = DSeparation.getPathSearch(G, X, Y, Z, 'd-con')
+        if C.size == 0:
+            return np.ones((0, 0), dtype=bool)
 
-        if search is None:
-            return []
+        # the reachability sweep only knows about directed and bidirected edges
+        if len(G.otherEdgeTypes()) > 0:
+            queries = [([x], [y], Z) for x in C.nodes for y in C.nodes]
+
+            return DSeparation.testMany(G, queries).reshape(C.size, C.size)
+
+        observed = DSeparation.getObservedVariables(G, Z)
+        isObserved = C.toMask(list(observed['observed']))
+        isAncOfObs = C.toMask(list(observed['ancestors']))
+
+        rows = plu.mapChunks(DSeparation.connectedRows, np.arange(C.size), processes, (C,), (isObserved, isAncOfObs))
+
+        return ~np.vstack(rows)
+
+    # CompactGraph, int[], bool[], bool[]
+    # boolean[][]
+
+    @staticmethod
+    def connectedRows(C, sources, isObserved, isAncOfObs):
+        # d-connection from every source (row) to every node of C (column): the Bayes-ball sweep of
+        # reachableNames, run for all the sources at once; every node carries a bitset of the sources
+        # that entered it through an arrowhead (head) and another one of those that entered it through
+        # a tail, and each round moves the bits that are new at every node across every edge at once
+        sources = np.asarray(sources, dtype=np.int64)
+        words = max((len(sources) + 63) // 64, 1)
+        shape = (C.size, words)
 
-        return search.findPaths(None, 1e8)
+        visitedHead = np.zeros(shape, dtype=np.uint64)
+        visitedTail = np.zeros(shape, dtype=np.uint64)
+        newHead = np.zeros(shape, dtype=np.uint64)
+        newTail = np.zeros(shape, dtype=np.uint64)
+        reached = np.zeros(shape, dtype=np.uint64)
+
+        # sources behave like nodes entered through a tail, an observed source reaches nothing
+        bits = np.arange(len(sources))
+        keep = ~isObserved[sources]
+        np.bitwise_or.at(newTail, (sources[keep], bits[keep] // 64), np.left_shift(np.uint64(1), (bits[keep] % 64).astype(np.uint64)))
+
+        isObserved = isObserved[:, None]
+        isAncOfObs = isAncOfObs[:, None]
+
+        while newHead.any() or newTail.any():
+            visitedHead = visitedHead | newHead
+            visitedTail = visitedTail | newTail
+
+            # same rules as reachableNames, per bit; spouses are left the same way as parents
+            toParents = np.where(isObserved, newHead, np.where(isAncOfObs, newHead | newTail, newTail))
+            toChildren = np.where(isObserved, np.uint64(0), newHead | newTail)
+
+            # a parent is entered through the tail of its edge, children and spouses through an arrowhead
+            # so a node gathers the bits its children send up, and those its parents and spouses send down
+            enteredTail = DSeparation.gatherBits(C.children, toParents)
+            enteredHead = DSeparation.gatherBits(C.parents, toChildren) | DSeparation.gatherBits(C.spouses, toParents)
+
+            reached = reached | enteredHead | enteredTail
+            newHead = enteredHead & ~visitedHead
+            newTail = enteredTail & ~visitedTail
+
+        connected = np.unpackbits(reached.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        connected = connected[:, :len(sources)].T.astype(bool)
+
+        # a path cannot start and end at the same node
+        connected[np.arange(len(sources)), sources] = False
+
+        return connected
+
+    # (int[], int[]), uint64[][]
+    # uint64[][]
+
+    @staticmethod
+    def gatherBits(csr, bits):
+        # for every node i, the union of the bits of the nodes adjacent to i in csr
+        (indptr, indices) = csr
+        gathered = np.zeros(bits.shape, dtype=np.uint64)
+
+        if len(indices) == 0:
+            return gathered
+
+        counts = indptr[1:] - indptr[:-1]
+        rows = np.flatnonzero(counts > 0)
+        gathered[rows] = np.bitwise_or.reduceat(bits[indices], indptr[rows], axis=0)
+
+        return gathered
 
     # Path[]
 
     @staticmethod
-    def findDSeparatedPaths(G, X, Y, Z):
-        X = ou.makeArray(X)
-        Y = ou.makeArray(Y)
-        Z = ou.makeArray(Z)
+    def findDConnectedPaths(G, X, Y, Z, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        return list(DSeparation.iterDConnectedPaths(G, X, Y, Z, processes=processes, maxLength=maxLength, order=order))
 
-        search = DSeparation.getPathSearch(G, X, Y, Z, 'd-sep')
+    # Iterator[Path | CompactPath]
 
-        if search is None:
-            return []
+    @staticmethod
+    def iterDConnectedPaths(G, X, Y, Z, lastPath=None, compact=False, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        # lazily yields the paths found by findDConnectedPaths (see __iterPaths for the options)
+        return DSeparation.__iterPaths(G, X, Y, Z, 'd-con', lastPath, compact, processes, maxLength, order)
 
-        return search.findPaths(None, 1e8)
+    # Path[]
+
+    @staticmethod
+    def findDSeparatedPaths(G, X, Y, Z, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        return list(DSeparation.iterDSeparatedPaths(G, X, Y, Z, processes=processes, maxLength=maxLength, order=order))
+
+    # Iterator[Path | CompactPath]
+
+    @staticmethod
+    def iterDSeparatedPaths(G, X, Y, Z, lastPath=None, compact=False, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        # lazily yields the paths found by findDSeparatedPaths (see __iterPaths for the options)
+        return DSeparation.__iterPaths(G, X, Y, Z, 'd-sep', lastPath, compact, processes, maxLength, order)
 
     # Path[]
 
     @staticmethod
-    def findDConnectedDirectedPaths(G, X, Y, Z):
-        X = ou.makeArray(X)
-        Y = ou.makeArray(Y)
-        Z = ou.makeArray(Z)
+    def findDConnectedDirectedPaths(G, X, Y, Z, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        return list(DSeparation.iterDConnectedDirectedPaths(G, X, Y, Z, processes=processes, maxLength=maxLength, order=order))
+
+    # Iterator[Path | CompactPath]
+
+    @staticmethod
+    def iterDConnectedDirectedPaths(G, X, Y, Z, lastPath=None, compact=False, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        # lazily yields the paths found by findDConnectedDirectedPaths (see __iterPaths for the options)
+        return DSeparation.__iterPaths(G, X, Y, Z, 'd-con-directed', lastPath, compact, processes, maxLength, order)
+
+    # Graph, Node[], Node[], Node[], str, Path | CompactPath | Cursor, boolean, int, int, str
+    # Iterator[Path | CompactPath]
+
+    @staticmethod
+    def __iterPaths(G, X, Y, Z, type_, lastPath=None, compact=False, processes=None, maxLength=None, order=PathSearch.depthFirst):
+        # the paths of the given type, lazily, resuming after lastPath (a Path or a cursor)
+        # compact yields CompactPath objects instead, for enumerations too large to keep as Path objects
+        # processes splits the search across a pool of that many processes, the order of the paths is kept
+        # maxLength bounds the number of edges of the paths, and order=PathSearch.shortestFirst finds the shortest first
+        search = DSeparation.getPathSearch(G, X, Y, Z, type_)
+
+        if search is None:
+            return iter([])
+
+        search.maxLength = maxLength
+        search.order = order
+
+        if processes is not None and processes != 1:
+            return search.iterPathsInPool(lastPath, processes, None, compact)
+
+        return search.iterCompactPaths(lastPath) if compact else search.iterPaths(lastPath)
+
+    # Dict[str, Any]
+
+    @staticmethod
+    def countDConnectedPaths(G, X, Y, Z, budget=None, byNode=False, maxLength=None):
+        # see PathSearch.countPaths
+        return DSeparation.countPaths(G, X, Y, Z, 'd-con', budget, byNode, maxLength)
+
+    # Dict[str, Any]
+
+    @staticmethod
+    def countDSeparatedPaths(G, X, Y, Z, budget=None, byNode=False, maxLength=None):
+        return DSeparation.countPaths(G, X, Y, Z, 'd-sep', budget, byNode, maxLength)
+
+    # Graph, Node[], Node[], Node[], str, number, boolean, int
+    # Dict[str, Any]
 
-        search = DSeparation.getPathSearch(G, X, Y, Z, 'd-con-directed')
+    @staticmethod
+    def countPaths(G, X, Y, Z, type_, budget=None, byNode=False, maxLength=None):
+        search = DSeparation.getPathSearch(G, X, Y, Z, type_)
 
         if search is None:
-            return []
+            return {'count': 0, 'exact': True, 'nodes': dict()}
 
-        return search.findPaths(None, 1e8)
+        search.maxLength = maxLength
+
+        return search.countPaths(budget, byNode)
 
     # PathSearch
 
@@ -87,17 +393,19 @@ class DSeparation():
         observed = DSeparation.getObservedVariables(G, Z)
 
         if type_ == 'd-sep':
-            # search.pathFilter = function (path) { return filterDSeparatedPaths(path, observed.observed, observed.ancestors) }
-            search.pathFilter = lambda path: DSeparation.filterDSeparatedPaths(
-                path, observed['observed'], observed['ancestors'])
+            # the search keeps track of the first node closing the path as it goes,
+            # instead of checking every path found with filterDSeparatedPaths
+            search.blockingNode = partial(DSeparation.blockingNode,
+                                          observed=observed['observed'], ancOfObserved=observed['ancestors'])
         elif type_ == 'd-con':
             # search.edgeFilter = (graph, node, previous) => this.edgeFilterDConnectedPaths(graph, node, previous, observed.observed, observed.ancestors)
-            search.edgeFilter = lambda graph, node, previous: DSeparation.edgeFilterDConnectedPaths(
-                graph, node, previous, observed['observed'], observed['ancestors'])
+            search.edgeFilter = partial(DSeparation.edgeFilterDConnectedPaths,
+                                        observed=observed['observed'], ancOfObserved=observed['ancestors'])
+            search.edgeFilterState = enteredThroughArrowhead
         elif type_ == 'd-con-directed':
             # search.pathFilter = (path) => this.filterDConnectedDirectedPaths(path, observed.observed, observed.ancestors)
-            search.pathFilter = lambda path: DSeparation.filterDConnectedDirectedPaths(
-                path, observed['observed'], observed['ancestors'])
+            search.pathFilter = partial(DSeparation.filterDConnectedDirectedPaths,
+                                        observed=observed['observed'], ancOfObserved=observed['ancestors'])
 
         return search
 
@@ -107,37 +415,45 @@ class DSeparation():
     @staticmethod
     def filterDSeparatedPaths(path, observed, ancOfObserved):
         for i in range(1, len(path.edges)):
-            prev = path.edges[i - 1]
-            curr = path.edges[i]
+            if DSeparation.blockingNode(path.edges[i - 1], path.edges[i], observed, ancOfObserved) is not None:
+                return True
 
-            isAncOfObs = curr.source in ancOfObserved and ancOfObserved[curr.source] is not None
-            isObserved = curr.source in observed and observed[curr.source] is not None
+        return False
 
-            isPrevDirected = prev.edge['type_'] == directedEdgeType.id_
-            isPrevBidirected = prev.edge['type_'] == bidirectedEdgeType.id_
-            isPrevIncoming = isPrevBidirected or (
-                isPrevDirected and prev.direction == PathDirection.directed)
+    # PathEdge, PathEdge, ObservedNodes, ObservedNodes
+    # str
 
-            isCurrDirected = curr.edge['type_'] == directedEdgeType.id_
-            isCurrBidirected = curr.edge['type_'] == bidirectedEdgeType.id_
-            isCurrOutgoingDirected = isCurrDirected and curr.direction == PathDirection.directed
-            isCurrIncomingDirected = isCurrDirected and curr.direction == PathDirection.reversed
+    @staticmethod
+    def blockingNode(prev, curr, observed, ancOfObserved):
+        # the node between the two edges if it closes the path there, None otherwise
+        isAncOfObs = curr.source in ancOfObserved and ancOfObserved[curr.source] is not None
+        isObserved = curr.source in observed and observed[curr.source] is not None
 
-            # closed v-structure
-            if isPrevIncoming and not isAncOfObs:
-                if isCurrBidirected or isCurrIncomingDirected:
-                    return True
+        isPrevDirected = prev.edge['type_'] == directedEdgeType.id_
+        isPrevBidirected = prev.edge['type_'] == bidirectedEdgeType.id_
+        isPrevIncoming = isPrevBidirected or (
+            isPrevDirected and prev.direction == PathDirection.directed)
 
-            # closed chain
-            elif isPrevIncoming and isObserved:
-                if isCurrOutgoingDirected:
-                    return True
+        isCurrDirected = curr.edge['type_'] == directedEdgeType.id_
+        isCurrBidirected = curr.edge['type_'] == bidirectedEdgeType.id_
+        isCurrOutgoingDirected = isCurrDirected and curr.direction == PathDirection.directed
+        isCurrIncomingDirected = isCurrDirected and curr.direction == PathDirection.reversed
 
-            # closed fork, and reversed chain
-            elif not isPrevIncoming and isObserved:
-                return True
+        # closed v-structure
+        if isPrevIncoming and not isAncOfObs:
+            if isCurrBidirected or isCurrIncomingDirected:
+                return curr.source
 
-        return False
+        # closed chain
+        elif isPrevIncoming and isObserved:
+            if isCurrOutgoingDirected:
+                return curr.source
+
+        # closed fork, and reversed chain
+        elif not isPrevIncoming and isObserved:
+            return curr.source
+
+        return None
 
     # Graph, Node, PathEdge, ObservedNodes, ObservedNodes
     # Edge[]
@@ -292,17 +608,15 @@ class DSeparation():
     @staticmethod
     def getObservedVariables(G, nodes):
         observed = dict()
-        ancObserved = dict()
 
         for node in nodes:
             observed[node['name']] = True
 
-            ancestors = gu.ancestors(node, G)
-
-            for anc in ancestors:
-                ancObserved[anc['name']] = True
+        # ancestors only include nodes of G
+        ancObserved = G.ancestorNames(observed)
 
         return {
             'observed': observed,
             'ancestors': ancObserved
         }
+
@@ -0,0 +1,178 @@
+from src.graph.classes.graph_defs import latentNodeType
+from src.path_analysis.d_separation import DSeparation
+
+from src.common.object_utils import ObjectUtils as ou
+
+
+class ImpliedIndependencies():
+    """
+    Enumerates the conditional independencies implied by a diagram, one per pair of
+    non-adjacent observed nodes that can be d-separated, along with a minimal
+    separating set of observed nodes. Together they form a basis of the testable
+    implications of the diagram (the missing edges).
+
+    Methods
+    -------
+    iterImpliedIndependencies(G, nodes = None, observed = None)
+        Yields the implied independencies one at a time.
+    listImpliedIndependencies(G, nodes = None, limit = 1e8, observed = None)
+        Returns a list of implied independencies.
+    minimalSeparator(G, x, y, candidates)
+        Returns a minimal subset of candidates separating x and y, if any.
+    """
+
+    # Graph, Node[], Dict[str, Any]
+    # Iterator[Dict[str, Any]]
+    @staticmethod
+    def iterImpliedIndependencies(G, nodes = None, observed = None):
+        # pairs are visited in node order; adjacent pairs are dependent and skipped right away,
+        # and so are the pairs that no set of observed nodes separates
+        # observed names the nodes that can be measured, all the non-latent nodes by default;
+        # latent nodes and names that are not in the graph are left out of it
+        if nodes is None:
+            nodes = G.nodes
+
+        measured = dict()
+
+        for node in G.nodes:
+            if node['type_'] != latentNodeType.id_ and (observed is None or node['name'] in observed):
+                measured[node['name']] = True
+
+        observed = measured
+        nodes = list(filter(lambda n: n['name'] in observed, ou.makeArray(nodes)))
+
+        for i in range(len(nodes)):
+            x = nodes[i]
+            neighbors = G.neighborNames(x['name'])
+
+            for j in range(i + 1, len(nodes)):
+                y = nodes[j]
+
+                if y['name'] == x['name'] or y['name'] in neighbors:
+                    continue
+
+                Z = ImpliedIndependencies.minimalSeparator(G, x, y, observed)
+
+                if Z is not None:
+                    yield {'X': x, 'Y': y, 'Z': Z}
+
+
+    # Graph, Node[], number, Dict[str, Any]
+    # Dict[str, Any][]
+    @staticmethod
+    def listImpliedIndependencies(G, nodes = None, limit = 1e8, observed = None):
+        independencies = []
+
+        for independency in ImpliedIndependencies.iterImpliedIndependencies(G, nodes, observed):
+            if len(independencies) >= limit:
+                break
+
+            independencies.append(independency)
+
+        return independencies
+
+
+    # Graph, Node, Node, Dict[str, Any]
+    # Node[]
+    @staticmethod
+    def minimalSeparator(G, x, y, candidates):
+        # if any subset of the candidates separates x and y, so does the part of the candidates
+        # among the ancestors of x and y; that one is checked with the d-separation sweep
+        ancestors = G.ancestorNames([x['name'], y['name']])
+        Z = dict()
+
+        for name in ancestors:
+            if name in candidates and name != x['name'] and name != y['name']:
+                Z[name] = True
+
+        Znodes = G.nodesFromNames(list(Z))
+        observed = DSeparation.getObservedVariables(G, Znodes)
+
+        if DSeparation.isDConnected(G, [x], [y], observed['observed'], observed['ancestors']):
+            return None
+
+        # the graph without other edge types is all the sweep knows about
+        if len(G.otherEdgeTypes()) > 0:
+            return Znodes
+
+        # any subset of Z leaves the ancestors of x and y unchanged, so separation by a subset of Z
+        # is plain separation in their moral graph: keep the nodes of Z reachable from x without
+        # going through Z, then those of the remaining ones reachable from y
+        districts = ImpliedIndependencies.districts(G, ancestors)
+        Z = ImpliedIndependencies.reachableInMoralGraph(G, x['name'], Z, ancestors, districts)
+        Z = ImpliedIndependencies.reachableInMoralGraph(G, y['name'], Z, ancestors, districts)
+
+        return G.nodesFromNames(list(Z))
+
+
+    # Graph, str, Dict[str, boolean], Dict[str, boolean], Dict[str, Dict[str, Any]]
+    # Dict[str, boolean]
+    @staticmethod
+    def reachableInMoralGraph(G, start, blocked, ancestors, districts):
+        # nodes of blocked reached from start in the moral graph of the ancestral set, without
+        # going through blocked nodes; the moral graph joins every node of a c-component with
+        # the others and with their parents, so each c-component is visited through a single hub
+        visitedNodes = {start: True}
+        visitedHubs = dict()
+        reached = dict()
+        stack = [start]
+
+        while len(stack) > 0:
+            name = stack.pop()
+            hubs = [districts[name]]
+
+            for child in G.childNames(name):
+                if child in ancestors:
+                    hubs.append(districts[child])
+
+            for hub in hubs:
+                if hub['id'] in visitedHubs:
+                    continue
+
+                visitedHubs[hub['id']] = True
+
+                for other in hub['nodes']:
+                    if other in visitedNodes:
+                        continue
+
+                    visitedNodes[other] = True
+
+                    if other in blocked:
+                        reached[other] = True
+                    else:
+                        stack.append(other)
+
+        return reached
+
+
+    # Graph, Dict[str, boolean]
+    # Dict[str, Dict[str, Any]]
+    @staticmethod
+    def districts(G, ancestors):
+        # c-components of the ancestral set, each with its nodes and their parents
+        districts = dict()
+        count = 0
+
+        for name in ancestors:
+            if name in districts:
+                continue
+
+            district = {'id': count, 'nodes': dict()}
+            count = count + 1
+            stack = [name]
+            districts[name] = district
+
+            while len(stack) > 0:
+                current = stack.pop()
+                district['nodes'][current] = True
+
+                for spouse in G.spouseNames(current):
+                    if spouse in ancestors and spouse not in districts:
+                        districts[spouse] = district
+                        stack.append(spouse)
+
+            for member in list(district['nodes']):
+                for parent in G.parentNames(member):
+                    district['nodes'][parent] = True
+
+        return districts
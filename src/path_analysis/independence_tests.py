@@ -0,0 +1,214 @@
+import math
+import numpy as np
+import pandas as pd
+
+from src.path_analysis.implied_independencies import ImpliedIndependencies
+
+from src.inference.utils.pool_utils import PoolUtils as plu
+from src.common.object_utils import ObjectUtils as ou
+
+
+class IndependenceTests():
+    """
+    Tests the conditional independencies implied by a diagram against a table of
+    discrete data. The rows of the data are first collapsed into the counts of their
+    distinct value combinations, which all the tests share; the contingency table of
+    each (X _||_ Y | Z) statement is then a single weighted bincount over those combinations.
+
+    Methods
+    -------
+    testImpliedIndependencies(G, data, independencies = None, test = 'chi-square', processes = None)
+        Returns a DataFrame with the statistic, degrees of freedom and p-value of every statement.
+    testIndependence(table, x, y, Z, test = 'chi-square')
+        Returns the statistic, degrees of freedom and sample size of a single statement.
+    contingencyTable(data, columns)
+        Collapses the data into the counts of its distinct value combinations.
+    chiSquareSurvival(statistic, dof)
+        Returns the upper tail probability of the chi-square distribution.
+    """
+
+    chiSquare = 'chi-square'
+    gTest = 'g-test'
+
+    # Graph, DataFrame, Dict[str, Any][], str, number
+    # DataFrame
+    @staticmethod
+    def testImpliedIndependencies(G, data, independencies = None, test = chiSquare, processes = None):
+        # statements default to the implied independencies among the non-latent nodes with a column in the data;
+        # statements are split across a pool of processes when processes is given
+        if test != IndependenceTests.chiSquare and test != IndependenceTests.gTest:
+            raise Exception('Unknown independence test: ' + str(test))
+
+        if independencies is None:
+            observed = dict(map(lambda c: (c, True), data.columns))
+            independencies = ImpliedIndependencies.iterImpliedIndependencies(G, observed = observed)
+
+        statements = []
+
+        for independency in independencies:
+            x = IndependenceTests.nodeName(independency['X'])
+            y = IndependenceTests.nodeName(independency['Y'])
+            Z = tuple(map(IndependenceTests.nodeName, ou.makeArray(independency['Z'])))
+
+            for name in (x, y) + Z:
+                if name not in data.columns:
+                    raise Exception('The data has no column for ' + name)
+
+            statements.append((x, y, Z))
+
+        columns = []
+
+        for statement in statements:
+            for name in (statement[0], statement[1]) + statement[2]:
+                if name not in columns:
+                    columns.append(name)
+
+        table = IndependenceTests.contingencyTable(data, columns)
+
+        chunks = plu.mapChunks(IndependenceTests.testMany, statements, processes, (table,), (test,))
+        results = [result for chunk in chunks for result in chunk]
+
+        return pd.DataFrame({
+            'X': list(map(lambda s: s[0], statements)),
+            'Y': list(map(lambda s: s[1], statements)),
+            'Z': list(map(lambda s: s[2], statements)),
+            'statistic': list(map(lambda r: r['statistic'], results)),
+            'dof': list(map(lambda r: r['dof'], results)),
+            'pValue': list(map(lambda r: IndependenceTests.chiSquareSurvival(r['statistic'], r['dof']), results)),
+            'n': list(map(lambda r: r['n'], results))
+        }, columns = ['X', 'Y', 'Z', 'statistic', 'dof', 'pValue', 'n'])
+
+
+    # Dict[str, Any], (str, str, str[])[], str
+    # Dict[str, number][]
+    @staticmethod
+    def testMany(table, statements, test = chiSquare):
+        return list(map(lambda s: IndependenceTests.testIndependence(table, s[0], s[1], s[2], test), statements))
+
+
+    # DataFrame, str[]
+    # Dict[str, Any]
+    @staticmethod
+    def contingencyTable(data, columns):
+        # every column becomes integer codes over the distinct combinations, with -1 for missing values
+        if len(columns) == 0:
+            return {'codes': dict(), 'levels': dict(), 'counts': np.array([len(data)], dtype = np.float64)}
+
+        counts = data.groupby(list(columns), dropna = False, observed = True, sort = False).size().reset_index(name = '__count')
+        codes = dict()
+        levels = dict()
+
+        for column in columns:
+            (code, uniques) = pd.factorize(counts[column])
+            codes[column] = code.astype(np.int64)
+            levels[column] = max(len(uniques), 1)
+
+        return {'codes': codes, 'levels': levels, 'counts': counts['__count'].to_numpy(dtype = np.float64)}
+
+
+    # Dict[str, Any], str, str, str[], str
+    # Dict[str, number]
+    @staticmethod
+    def testIndependence(table, x, y, Z, test = chiSquare):
+        codes = table['codes']
+        (xc, yc) = (codes[x], codes[y])
+        (kx, ky) = (table['levels'][x], table['levels'][y])
+
+        # rows missing any of the variables of the statement are left out of it
+        keep = (xc >= 0) & (yc >= 0)
+
+        for name in Z:
+            keep = keep & (codes[name] >= 0)
+
+        weights = table['counts'][keep]
+        (xc, yc) = (xc[keep], yc[keep])
+
+        # strata are the observed combinations of values of Z
+        if len(Z) > 0 and len(weights) > 0:
+            (_, zc) = np.unique(np.column_stack([codes[name][keep] for name in Z]), axis = 0, return_inverse = True)
+            zc = zc.reshape(-1)
+            strata = zc.max() + 1
+        else:
+            zc = np.zeros(len(weights), dtype = np.int64)
+            strata = 1
+
+        n = np.bincount((zc * kx + xc) * ky + yc, weights = weights, minlength = strata * kx * ky).reshape(strata, kx, ky)
+        nx = n.sum(axis = 2)
+        ny = n.sum(axis = 1)
+        nz = nx.sum(axis = 1)
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            expected = nx[:, :, None] * ny[:, None, :] / nz[:, None, None]
+
+            if test == IndependenceTests.gTest:
+                terms = np.where(n > 0, n * np.log(n / expected), 0)
+                statistic = 2 * terms.sum()
+            else:
+                terms = np.where(expected > 0, (n - expected) ** 2 / expected, 0)
+                statistic = terms.sum()
+
+        # each stratum contributes (rows - 1)(columns - 1) over the values it actually contains
+        rows = np.maximum(np.count_nonzero(nx, axis = 1) - 1, 0)
+        cols = np.maximum(np.count_nonzero(ny, axis = 1) - 1, 0)
+        dof = int((rows * cols).sum())
+
+        return {'statistic': float(statistic), 'dof': dof, 'n': int(weights.sum())}
+
+
+    # number, int
+    # number
+    @staticmethod
+    def chiSquareSurvival(statistic, dof):
+        # regularized upper incomplete gamma function Q(dof / 2, statistic / 2), computed with
+        # its series below a + 1 and with its continued fraction above (Numerical Recipes 6.2)
+        if dof <= 0 or statistic <= 0:
+            return 1.0
+
+        a = dof / 2
+        x = statistic / 2
+        logPrefix = a * math.log(x) - x - math.lgamma(a)
+
+        if x < a + 1:
+            term = 1 / a
+            total = term
+            ap = a
+
+            for _ in range(1000):
+                ap = ap + 1
+                term = term * x / ap
+                total = total + term
+
+                if abs(term) < abs(total) * 1e-15:
+                    break
+
+            return max(0.0, 1 - total * math.exp(logPrefix))
+
+        tiny = 1e-300
+        b = x + 1 - a
+        c = 1 / tiny
+        d = 1 / b
+        h = d
+
+        for i in range(1, 1000):
+            an = -i * (i - a)
+            b = b + 2
+            d = an * d + b
+            d = tiny if abs(d) < tiny else d
+            c = b + an / c
+            c = tiny if abs(c) < tiny else c
+            d = 1 / d
+            delta = d * c
+            h = h * delta
+
+            if abs(delta - 1) < 1e-15:
+                break
+
+        return min(1.0, math.exp(logPrefix) * h)
+
+
+    # Node | str
+    # str
+    @staticmethod
+    def nodeName(node):
+        return node if isinstance(node, str) else node['name']
+
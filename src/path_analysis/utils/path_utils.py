@@ -2,7 +2,7 @@ from functools import partial
 
 from src.graph.classes.graph_defs import directedEdgeType
 from src.path_analysis.classes.direction import Direction as PathDirection
-from src.path_analysis.classes.path_search import PathSearch
+from src.path_analysis.classes.path_search import PathSearch, enteredThroughArrowhead
 from src.inference.utils.graph_utils import compareNames
 
 from src.inference.utils.graph_utils import GraphUtils as gu
@@ -14,7 +14,7 @@ from src.path_analysis.utils.edge_filter import EdgeFilter
 class PathUtils():
 
     @staticmethod
-    def findDirectedPaths(graph, source, target, prohibitedIntermediateNodes = [], numPaths = 1e4):
+    def findDirectedPaths(graph, source, target, prohibitedIntermediateNodes = [], numPaths = 1e4, maxLength = None, order = PathSearch.depthFirst):
         if not graph or not source or not target:
             return []
 
@@ -33,13 +33,15 @@ class PathUtils():
 
         pathSearch = PathSearch(graph, source, target)
         pathSearch.pathFilter = PathUtils.filterForDirectedPath(graph, prohibitedIntermediateNodes)
+        pathSearch.maxLength = maxLength
+        pathSearch.order = order
 
         return pathSearch.findPaths(None, numPaths)
 
 
     # Path[]
     @staticmethod
-    def findConfoundingPaths(G, source, target, adjusted = [], numPaths = 1e4):
+    def findConfoundingPaths(G, source, target, adjusted = [], numPaths = 1e4, maxLength = None, order = PathSearch.depthFirst):
         if not G or not source or not target:
             return []
 
@@ -58,6 +60,9 @@ class PathUtils():
 
         pathSearch = PathSearch(G, source, target)
         pathSearch.edgeFilter = EdgeFilter.edgeFilterConfoundingPaths(source, adjusted)
+        pathSearch.edgeFilterState = enteredThroughArrowhead
+        pathSearch.maxLength = maxLength
+        pathSearch.order = order
         
         return pathSearch.findPaths(None, numPaths)
 
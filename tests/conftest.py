@@ -0,0 +1,75 @@
+import random
+import pytest
+
+from src.fusion import parseGraph
+from src.graph.classes.graph import Graph
+
+
+# figure 4.12: X confounded with Z6, which is confounded with Z7
+figure412 = '''
+<NODES>
+X
+Y
+Z1
+Z2
+Z3
+Z4
+Z5
+Z6
+Z7
+
+<EDGES>
+X -> Z1
+X -> Z4
+Z1 -> Y
+Z2 -> X
+Z2 -> Z5
+Z3 -> Y
+Z4 -> Z3
+Z5 -> Y
+Z6 -> Z2
+Z6 -> Z5
+Z7 -> Z5
+Z7 -> Y
+X -- Z6
+Z6 -- Z7
+'''
+
+
+# int, int, int
+# Graph
+def randomDiagram(rng, minSize = 3, maxSize = 8):
+    # an acyclic diagram on V0..Vn-1, with both a directed and a bidirected edge between some pairs
+    n = rng.randint(minSize, maxSize)
+    names = ['V' + str(i) for i in range(n)]
+    edges = []
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            r = rng.random()
+
+            if r < 0.4:
+                edges.append({'from_': names[i], 'to_': names[j]})
+
+            if r < 0.05 or 0.4 <= r < 0.5:
+                edges.append({'from_': names[i], 'to_': names[j], 'type_': 'bidirected'})
+
+    return Graph(nodes = list(map(lambda name: {'name': name}, names)), edges = edges)
+
+
+@pytest.fixture
+def diagram():
+    return parseGraph(figure412)
+
+
+@pytest.fixture
+def diagrams():
+    rng = random.Random(7)
+
+    return [randomDiagram(rng) for i in range(40)]
+
+
+@pytest.fixture
+def wideDiagram():
+    # enough nodes for a bitset over them to take more than one 64-bit word
+    return randomDiagram(random.Random(18), 70, 70)
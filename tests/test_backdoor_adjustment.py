@@ -0,0 +1,138 @@
+import sys
+import random
+import itertools
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.graph.classes.graph import Graph
+from src.adjustment.backdoor_adjustment import BackdoorAdjustment
+from src.path_analysis.d_separation import DSeparation
+from src.inference.utils.graph_utils import GraphUtils as gu
+
+
+# Graph, Node[], Node[]
+# (Node[], Graph)[]
+def admissibleSets(G, X, Y):
+    # every set of observed nodes (among the ancestors of X and Y) meeting the adjustment criterion,
+    # i.e., none of them is a proper causal descendant and together they separate X and Y in the
+    # proper back-door graph, tried one by one
+    Gpbd = gu.gpbd(G, X, Y)
+    forbidden = gu.nodeToNameMap(gu.Dpcp(G, X, Y) + X + Y)
+    An = G.ancestorNames(list(map(lambda n: n['name'], X + Y)))
+    candidates = list(filter(lambda n: n['name'] not in forbidden and n['name'] in An and n['type_'] != 'latent', G.nodes))
+    sets = []
+
+    for size in range(len(candidates) + 1):
+        for S in itertools.combinations(candidates, size):
+            if DSeparation.test(Gpbd, X, Y, list(S)):
+                sets.append(sorted(map(lambda n: n['name'], S)))
+
+    return sets
+
+
+@pytest.fixture
+def queries():
+    # (G, X, Y) with some latent nodes, X among the first nodes and Y among the last ones
+    rng = random.Random(21)
+    queries = []
+
+    while len(queries) < 60:
+        n = rng.randint(4, 9)
+        names = ['V' + str(i) for i in range(n)]
+        nodes = list(map(lambda name: {'name': name, 'type_': 'latent' if rng.random() < 0.15 else 'basic'}, names))
+        edges = []
+
+        for i in range(n):
+            for j in range(i + 1, n):
+                r = rng.random()
+
+                if r < 0.35:
+                    edges.append({'from_': names[i], 'to_': names[j]})
+                elif r < 0.45:
+                    edges.append({'from_': names[i], 'to_': names[j], 'type_': 'bidirected'})
+
+        G = Graph(nodes = nodes, edges = edges)
+        X = [G.nodes[rng.randrange(n // 2)]]
+        Y = [G.nodes[n - 1 - rng.randrange(n // 2)]]
+
+        if X[0]['type_'] != 'latent' and Y[0]['type_'] != 'latent':
+            queries.append((G, X, Y))
+
+    return queries
+
+
+def testMinimumSetsMatchBruteForce(queries):
+    for (G, X, Y) in queries:
+        sets = admissibleSets(G, X, Y)
+        size = min(map(len, sets), default = 0)
+
+        assert BackdoorAdjustment.listAdmissibleSets(G, X, Y) == list(filter(lambda S: len(S) == size, sets))
+
+
+def testConcurrentEnumerationsMatchSequential(queries):
+    expected = list(map(lambda query: BackdoorAdjustment.listAdmissibleSets(*query), queries))
+    interval = sys.getswitchinterval()
+
+    # switch threads as often as possible, so that the enumerations interleave
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            for i in range(3):
+                assert list(pool.map(lambda query: BackdoorAdjustment.listAdmissibleSets(*query), queries)) == expected
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def testLazySeparatorsMatchBruteForce(queries):
+    for (G, X, Y) in queries:
+        sets = admissibleSets(G, X, Y)
+        keys = list(map(frozenset, sets))
+        # the minimal ones: none of their proper subsets is admissible
+        minimal = [S for (S, key) in zip(sets, keys) if not any(map(lambda other: other < key, keys))]
+        found = list(BackdoorAdjustment.iterAdmissibleSets(G, X, Y))
+
+        assert sorted(found) == sorted(minimal)
+
+        # stopping early yields the first of the same sets
+        if len(found) > 1:
+            assert list(itertools.islice(BackdoorAdjustment.iterAdmissibleSets(G, X, Y), 1)) == found[:1]
+
+
+def testMinimumAdjustmentMatchesBruteForce(queries):
+    rng = random.Random(23)
+
+    for (G, X, Y) in queries:
+        sets = admissibleSets(G, X, Y)
+        found = BackdoorAdjustment.findMinimumAdjustment(G, X, Y)
+
+        if len(sets) == 0:
+            assert found is None
+            continue
+
+        assert found in sets and len(found) == min(map(len, sets))
+
+        # with costs, including some that are never worth paying
+        weights = dict(map(lambda n: (n['name'], rng.choice([1, 2, 5, float('inf')])), G.nodes))
+        cost = lambda S: sum(map(lambda name: weights[name], S))
+        found = BackdoorAdjustment.findMinimumAdjustment(G, X, Y, weights)
+        cheapest = min(map(cost, sets))
+
+        if cheapest == float('inf'):
+            assert found is None
+        else:
+            assert found in sets and cost(found) == cheapest
+
+
+def testPairsMatchOneCallPerPair(diagram):
+    nodes = diagram.nodes
+    pairs = [([x], [y]) for x in nodes for y in nodes if x['name'] != y['name']]
+    pairs = pairs + [(nodes[:2], nodes[-1]), (nodes[0], nodes[-2:])]
+
+    for Z in ([], gu.getNodesByName(['Z3'], diagram)):
+        expected = list(map(lambda pair: BackdoorAdjustment.listAdmissibleSets(diagram, pair[0], pair[1], Z), pairs))
+        keys = list(map(lambda pair: BackdoorAdjustment.pairKey(*pair), pairs))
+
+        assert BackdoorAdjustment.listAdmissibleSetsForPairs(diagram, pairs, Z) == dict(zip(keys, expected))
+        assert BackdoorAdjustment.listAdmissibleSetsForPairs(diagram, pairs, Z, processes = 2) == dict(zip(keys, expected))
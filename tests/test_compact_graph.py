@@ -0,0 +1,49 @@
+from src.graph.classes.graph import Graph
+from src.graph.classes.graph_defs import directedEdgeType, bidirectedEdgeType, undirectedEdgeType, Direction
+from src.inference.utils.graph_utils import GraphUtils as gu
+
+
+def names(nodes):
+    return list(map(lambda n: n['name'], nodes))
+
+
+def testCompactGraphMatchesGraph(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        C = G.compact()
+
+        for node in G.nodes:
+            assert names(gu.ancestors(node, C)) == names(gu.ancestors(node, G))
+            assert names(gu.descendants(node, C)) == names(gu.descendants(node, G))
+            assert names(gu.reach(node, C)) == names(gu.reach(node, G))
+
+        assert [C.names[i] for i in C.topoSort(True)] == names(gu.topoSort(G, True))
+        assert list(map(names, gu.cCompDecomposition(C, True))) == list(map(names, gu.cCompDecomposition(G, True)))
+
+
+def testCompactGraphKeepsEdgeTypesApart():
+    G = Graph(nodes = list(map(lambda name: {'name': name}, 'ABCDEF')), edges = [
+        {'from_': 'A', 'to_': 'B'},
+        {'from_': 'B', 'to_': 'C', 'type_': 'bidirected'},
+        {'from_': 'C', 'to_': 'D', 'type_': 'undirected'},
+        {'from_': 'D', 'to_': 'E', 'type_': 'other'},
+        {'from_': 'F', 'to_': 'A'}
+    ])
+    C = G.compact()
+
+    for edgeType in (None, directedEdgeType, bidirectedEdgeType, undirectedEdgeType):
+        for direction in (Direction.both, Direction.forward, Direction.backward):
+            for node in G.nodes:
+                assert names(gu.reach(node, C, edgeType, direction)) == names(gu.reach(node, G, edgeType, direction))
+
+
+def testCompactMoralGraphMatchesGraph(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        M = gu.moralize(G)
+        (indptr, indices) = gu.moralize(G.compact()).others[undirectedEdgeType.id_]
+        pairs = set()
+
+        for i in range(len(indptr) - 1):
+            for j in indices[indptr[i]:indptr[i + 1]]:
+                pairs.add(tuple(sorted((G.nodes[i]['name'], G.nodes[j]['name']))))
+
+        assert sorted(pairs) == sorted(set(map(lambda e: tuple(sorted((e['from_'], e['to_']))), M.edges)))
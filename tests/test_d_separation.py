@@ -0,0 +1,57 @@
+import random
+import numpy as np
+
+from src.path_analysis.d_separation import DSeparation
+
+
+# Graph, Random, int
+# (Node[], Node[], Node[])[]
+def randomQueries(G, rng, count):
+    # disjoint X, Y and Z, with X and Y not empty
+    queries = []
+
+    for i in range(count):
+        nodes = rng.sample(G.nodes, len(G.nodes))
+        x = rng.randint(1, 2)
+        y = rng.randint(1, 2)
+
+        if x + y > len(nodes):
+            continue
+
+        z = rng.randint(0, min(3, len(nodes) - x - y))
+        queries.append((nodes[:x], nodes[x:x + y], nodes[x + y:x + y + z]))
+
+    return queries
+
+
+def testBayesBallMatchesPathSearch(diagram, diagrams):
+    rng = random.Random(3)
+
+    for G in [diagram] + diagrams:
+        for (X, Y, Z) in randomQueries(G, rng, 10):
+            assert DSeparation.test(G, X, Y, Z) == (len(DSeparation.findDConnectedPaths(G, X, Y, Z)) == 0)
+
+
+def testManyMatchesTest(diagram, diagrams):
+    rng = random.Random(4)
+
+    for G in [diagram] + diagrams:
+        queries = randomQueries(G, rng, 10)
+        # queries sharing Z share their sweeps
+        queries = queries + list(map(lambda query: (query[1], query[0], queries[0][2]), queries))
+        queries.append(([], G.nodes[:1], []))
+
+        assert list(DSeparation.testMany(G, queries)) == list(map(lambda query: DSeparation.test(G, *query), queries))
+
+
+def testMatrixMatchesTest(diagram, wideDiagram, diagrams):
+    rng = random.Random(18)
+
+    for G in [diagram, wideDiagram] + diagrams:
+        nodes = G.nodes
+        Z = rng.sample(nodes, rng.randint(0, 3))
+        expected = np.array([[x['name'] == y['name'] or DSeparation.test(G, x, y, Z) for y in nodes] for x in nodes])
+
+        assert (DSeparation.testMatrix(G, Z) == expected).all()
+
+    assert (DSeparation.testMatrix(diagram, [], 2) == DSeparation.testMatrix(diagram)).all()
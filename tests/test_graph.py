@@ -0,0 +1,294 @@
+import random
+import pytest
+
+from src.graph.classes.graph import Graph
+from src.graph.classes.graph_defs import directedEdgeType, bidirectedEdgeType
+from src.inference.utils.graph_utils import GraphUtils as gu
+
+
+# Graph, str, str
+# str[]
+def scanNeighbors(G, name, type_ = None):
+    # the neighbors of name found by going through the whole edge list, as the graph used to
+    names = []
+
+    for edge in G.edges:
+        if type_ is not None and edge['type_'] != type_:
+            continue
+
+        if edge['from_'] == name:
+            names.append(edge['to_'])
+        elif edge['to_'] == name:
+            names.append(edge['from_'])
+
+    return sorted(set(names))
+
+
+# Graph, str, boolean
+# str[]
+def scanAncestors(G, name, backward = True):
+    # the ancestors (or descendants) of name, itself included, found by going through the edge list
+    found = {name: True}
+    fringe = [name]
+
+    while len(fringe) > 0:
+        current = fringe.pop()
+
+        for edge in G.edges:
+            if edge['type_'] != 'directed':
+                continue
+
+            (start, end) = (edge['to_'], edge['from_']) if backward else (edge['from_'], edge['to_'])
+
+            if start == current and end not in found:
+                found[end] = True
+                fringe.append(end)
+
+    return sorted(found)
+
+
+# Graph
+# tuple
+def signature(G):
+    # everything the graph shows of its nodes, edges and indexes, in order
+    nodes = list(map(lambda n: (n['name'], n['label'], n['type_'], n['metadata']), G.nodes))
+    edges = list(map(lambda e: (e['from_'], e['to_'], e['type_'], e['label'], e['metadata']), G.edges))
+    indexes = list(map(lambda n: (sorted(G.parentNames(n['name'])), sorted(G.childNames(n['name'])), sorted(G.spouseNames(n['name'])), sorted(G.neighborNames(n['name']))), G.nodes))
+
+    return (nodes, edges, indexes)
+
+
+def assertIndexesMatchEdges(G):
+    for node in G.nodes:
+        name = node['name']
+        parents = sorted(set(e['from_'] for e in G.edges if e['to_'] == name and e['type_'] == 'directed'))
+        children = sorted(set(e['to_'] for e in G.edges if e['from_'] == name and e['type_'] == 'directed'))
+
+        assert sorted(G.parentNames(name)) == parents
+        assert sorted(G.childNames(name)) == children
+        assert sorted(G.spouseNames(name)) == scanNeighbors(G, name, 'bidirected')
+        assert sorted(G.neighborNames(name)) == scanNeighbors(G, name)
+        assert sorted(map(lambda n: n['name'], gu.parents(node, G))) == parents
+        assert sorted(map(lambda n: n['name'], gu.children(node, G))) == children
+
+
+def testTypedIndexesMatchEdges(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        assertIndexesMatchEdges(G)
+
+
+def testTypedIndexesFollowChanges(diagram):
+    diagram.deleteEdges(gu.getEdgeByName('Z6', 'Z5', diagram))
+    diagram.deleteNodes(gu.getNodeByName('Z2', diagram))
+    diagram.addNodes({'name': 'W'})
+    diagram.addEdges([{'from_': 'W', 'to_': 'X'}, {'from_': 'W', 'to_': 'Y', 'type_': 'bidirected'}])
+
+    assertIndexesMatchEdges(diagram)
+
+
+def assertClosuresMatchEdges(G):
+    for node in G.nodes:
+        assert sorted(G.ancestorNames([node['name']])) == scanAncestors(G, node['name'])
+        assert sorted(G.descendantNames([node['name']])) == scanAncestors(G, node['name'], False)
+
+
+def testClosuresMatchEdges(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        assertClosuresMatchEdges(G)
+
+
+def testClosuresFollowChanges(diagram):
+    assertClosuresMatchEdges(diagram)
+
+    diagram.addNodes({'name': 'W'})
+    diagram.addEdges([{'from_': 'Y', 'to_': 'W'}, {'from_': 'Z3', 'to_': 'Z5'}])
+    assertClosuresMatchEdges(diagram)
+
+    diagram.deleteEdges(gu.getEdgeByName('Z1', 'Y', diagram))
+    assertClosuresMatchEdges(diagram)
+
+    diagram.deleteNodes(gu.getNodeByName('Z4', diagram))
+    assertClosuresMatchEdges(diagram)
+
+
+# Graph, boolean
+# str[][]
+def reachComponents(G, sort_):
+    # the c-components found by reaching over the bidirected edges from every node, in topological order
+    assigned = dict()
+    components = []
+
+    for node in gu.topoSort(G, sort_):
+        if node['name'] not in assigned:
+            component = list(map(lambda n: n['name'], gu.reach(node, G, bidirectedEdgeType)))
+            assigned.update(dict.fromkeys(component, True))
+            components.append(component)
+
+    return components
+
+
+def testCComponentsMatchReach(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        for sort_ in (False, True):
+            assert G.cComponentNames(sort_) == reachComponents(G, sort_)
+
+    diagram.addEdges({'from_': 'Z1', 'to_': 'Z3', 'type_': 'bidirected'})
+    diagram.deleteEdges(gu.getEdgeByName('Z6', 'Z7', diagram))
+
+    assert list(map(lambda c: list(map(lambda n: n['name'], c)), gu.cCompDecomposition(diagram))) == reachComponents(diagram, False)
+
+
+# Graph, Node[], Node[]
+# Graph
+def copyTransform(G, overline, underline):
+    # G with the edges into overline and out of underline deleted from a copy, as transform used to
+    over = dict.fromkeys(map(lambda n: n['name'], overline), True)
+    under = dict.fromkeys(map(lambda n: n['name'], underline), True)
+    graph = G.copy()
+
+    graph.deleteEdges(list(filter(lambda e: e['to_'] in over or (e['type_'] == 'directed' and e['from_'] in under) or (e['type_'] == 'bidirected' and e['from_'] in over), graph.edges)))
+
+    return graph
+
+
+# Graph, Node[]
+# Graph
+def copySubgraph(G, subset):
+    names = dict.fromkeys(map(lambda n: n['name'], subset), True)
+    graph = G.copy()
+
+    graph.deleteNodes(list(filter(lambda n: n['name'] not in names, graph.nodes)))
+
+    return graph
+
+
+def assertSameGraph(G1, G2):
+    toTuple = lambda e: (e['from_'], e['to_'], e['type_'])
+
+    assert G1.nodes == G2.nodes
+    assert sorted(map(toTuple, G1.edges)) == sorted(map(toTuple, G2.edges))
+    assert G1.cComponentNames() == G2.cComponentNames()
+
+    for node in G1.nodes:
+        assert sorted(G1.neighborNames(node['name'])) == sorted(G2.neighborNames(node['name']))
+        assert sorted(G1.ancestorNames([node['name']])) == sorted(G2.ancestorNames([node['name']]))
+        assert sorted(G1.descendantNames([node['name']])) == sorted(G2.descendantNames([node['name']]))
+
+
+def testViewsMatchCopies(diagram, diagrams):
+    rng = random.Random(5)
+
+    for G in [diagram] + diagrams:
+        nodes = G.nodes
+        overline = rng.sample(nodes, rng.randint(0, 2))
+        underline = rng.sample(nodes, rng.randint(0, 2))
+        subset = rng.sample(nodes, rng.randint(1, len(nodes)))
+
+        assertSameGraph(gu.transform(G, overline, underline), copyTransform(G, overline, underline))
+        assertSameGraph(gu.subgraph(G, subset), copySubgraph(G, subset))
+        assertSameGraph(gu.subgraph(gu.transform(G, overline), subset), copySubgraph(copyTransform(G, overline, []), subset))
+
+
+def testViewsAliasTheirGraph(diagram):
+    X = gu.getNodeByName('X', diagram)
+    view = gu.transform(diagram, [X])
+
+    # a change of the graph shows through the view
+    diagram.addEdges({'from_': 'Z3', 'to_': 'Z5'})
+    assertSameGraph(view, copyTransform(diagram, [X], []))
+
+    # a change of the view turns it into a copy and leaves the graph alone
+    edges = len(diagram.edges)
+    view.addEdges({'from_': 'Z3', 'to_': 'Z7'})
+
+    assert len(diagram.edges) == edges
+    assert gu.getEdgeByName('Z3', 'Z7', view) is not None
+
+    # replacing the nodes of the graph keeps the views bound to it
+    view = gu.subgraph(diagram, [{'name': 'X'}, {'name': 'Y'}, {'name': 'W'}])
+    diagram.nodes = [{'name': 'W'}, {'name': 'X'}]
+
+    assert list(map(lambda n: n['name'], view.nodes)) == ['W', 'X']
+
+
+# str, str, Graph, EdgeType
+# Edge
+def scanEdge(from_, to_, G, edgeType):
+    # the first edge of the edge list between the first nodes matching from_ and to_
+    fromNode = next(filter(lambda n: gu.correctNodeName(n['name']) == gu.correctNodeName(from_), G.nodes), None)
+    toNode = next(filter(lambda n: gu.correctNodeName(n['name']) == gu.correctNodeName(to_), G.nodes), None)
+
+    if fromNode is None or toNode is None:
+        return None
+
+    return next(filter(lambda e: e['from_'] == fromNode['name'] and e['to_'] == toNode['name'] and (edgeType is None or e['type_'] == edgeType.id_), G.edges), None)
+
+
+def testNameLookupsMatchScans(diagrams):
+    # names that only differ by case and surrounding whitespace
+    G = Graph(nodes = [{'name': 'a'}, {'name': 'B'}, {'name': ' A'}, {'name': 'b '}, {'name': 'C'}], edges = [
+        {'from_': 'a', 'to_': 'B'},
+        {'from_': ' A', 'to_': 'C', 'type_': 'bidirected'}
+    ])
+
+    for name in ('a', 'A', ' a ', 'b', 'B', 'c', 'D'):
+        matches = list(filter(lambda n: gu.correctNodeName(n['name']) == gu.correctNodeName(name), G.nodes))
+
+        assert gu.getNodeByName(name, G) == (matches[0] if len(matches) > 0 else None)
+        assert gu.getNodesByName([name], G) == matches[-1:]
+        assert gu.getNodesByName([{'name': name}], G) == matches[-1:]
+
+    for G in [G] + diagrams:
+        for edge in G.edges:
+            for (from_, to_) in ((edge['from_'], edge['to_']), (edge['to_'], edge['from_'])):
+                for edgeType in (None, directedEdgeType, bidirectedEdgeType):
+                    assert gu.getEdgeByName(from_, to_, G, edgeType) == scanEdge(from_, to_, G, edgeType)
+
+
+def testDirectedAndBidirectedEdgesShareAPair():
+    toTuple = lambda e: (e['from_'], e['to_'], e['type_'])
+    expected = [('X', 'Y', 'directed'), ('Y', 'X', 'bidirected')]
+
+    # either insertion order keeps both edges, with the bidirected one stored reversed
+    for edges in ([('X', 'Y', 'directed'), ('X', 'Y', 'bidirected')], [('X', 'Y', 'bidirected'), ('X', 'Y', 'directed')]):
+        G = Graph(nodes = [{'name': 'X'}, {'name': 'Y'}], edges = list(map(lambda e: {'from_': e[0], 'to_': e[1], 'type_': e[2]}, edges)))
+
+        assert sorted(map(toTuple, G.edges)) == expected
+        assert G.parentNames('Y') == {'X': True}
+        assert G.spouseNames('X') == {'Y': True}
+        assert toTuple(G.getEdge('X', 'Y', 'directed')) == expected[0]
+        assert toTuple(G.getEdge('Y', 'X', 'bidirected')) == expected[1]
+
+        with pytest.raises(Exception):
+            G.addEdges({'from_': 'X', 'to_': 'Y'})
+
+
+def testFromArraysMatchesAddEdges():
+    rng = random.Random(10)
+    shortIds = {'->': 'directed', '--': 'bidirected'}
+
+    for i in range(200):
+        names = list('ABCDEFG')
+        count = rng.randint(0, 14)
+        froms = [rng.choice(names) for j in range(count)]
+        tos = [rng.choice(names) for j in range(count)]
+        types = [rng.choice(['directed', 'bidirected', 'undirected', None, '->', '--', bidirectedEdgeType]) for j in range(count)]
+        nodes = rng.sample(names, rng.randint(0, 3)) if rng.random() < 0.5 else None
+        edges = []
+
+        for (from_, to_, type_) in zip(froms, tos, types):
+            type_ = type_.id_ if type_ is bidirectedEdgeType else shortIds.get(type_, type_)
+            edges.append({'from_': from_, 'to_': to_, 'type_': type_} if type_ is not None else {'from_': from_, 'to_': to_})
+
+        # an edge that already exists raises in both, otherwise both build the same graph
+        try:
+            expected = signature(Graph(nodes = list(map(lambda name: {'name': name}, nodes or [])), edges = edges))
+        except Exception as e:
+            expected = str(e)
+
+        try:
+            actual = signature(Graph.fromArrays(froms, tos, types, nodes))
+        except Exception as e:
+            actual = str(e)
+
+        assert actual == expected
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from src.graph.classes.graph import Graph
+from src.graph.utils.graph_io_utils import GraphIOUtils
+
+
+def edgeTuples(G):
+    return list(map(lambda e: (e['from_'], e['to_'], e['type_']), G.edges))
+
+
+def testReadCSVMatchesAddEdges(tmp_path):
+    df = pd.DataFrame({'from': ['X', '01', 'Z', None, 'X'], 'to': ['Y', 'X', 'Y', 'X', 'Y'], 'type': ['->', None, '--', '->', 'bidirected']})
+    path = tmp_path / 'edges.csv'
+    df.to_csv(path, index = False)
+
+    # rows without both endpoints are skipped, names are kept as written and short ids are edge types
+    expected = Graph(edges = [
+        {'from_': 'X', 'to_': 'Y'},
+        {'from_': '01', 'to_': 'X'},
+        {'from_': 'Z', 'to_': 'Y', 'type_': 'bidirected'},
+        {'from_': 'X', 'to_': 'Y', 'type_': 'bidirected'}
+    ])
+
+    for G in (GraphIOUtils.fromDataFrame(df), GraphIOUtils.readCSV(path)):
+        assert G.nodes == expected.nodes
+        assert edgeTuples(G) == edgeTuples(expected)
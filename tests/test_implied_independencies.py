@@ -0,0 +1,66 @@
+import itertools
+
+from src.fusion import parseGraph
+from src.path_analysis.d_separation import DSeparation
+from src.path_analysis.implied_independencies import ImpliedIndependencies
+
+
+# Graph, Node, Node, Node[]
+# boolean
+def isSeparable(G, x, y, candidates):
+    # whether some subset of the candidates separates x and y, trying them all
+    for size in range(len(candidates) + 1):
+        for Z in itertools.combinations(candidates, size):
+            if DSeparation.test(G, x, y, list(Z)):
+                return True
+
+    return False
+
+
+def assertMatchesBruteForce(G, observed):
+    independencies = ImpliedIndependencies.listImpliedIndependencies(G)
+    pairs = list(map(lambda i: (i['X']['name'], i['Y']['name']), independencies))
+    expected = []
+
+    for (x, y) in itertools.combinations(observed, 2):
+        if y['name'] not in G.neighborNames(x['name']) and isSeparable(G, x, y, list(filter(lambda n: n is not x and n is not y, observed))):
+            expected.append((x['name'], y['name']))
+
+    assert pairs == expected
+
+    for independency in independencies:
+        Z = independency['Z']
+
+        # the separating set is made of observed nodes, and none of them can be left out
+        assert all(map(lambda z: z in observed, Z))
+        assert DSeparation.test(G, independency['X'], independency['Y'], Z)
+
+        for z in Z:
+            assert not DSeparation.test(G, independency['X'], independency['Y'], list(filter(lambda n: n is not z, Z)))
+
+
+def testImpliedIndependenciesMatchBruteForce(diagram, diagrams):
+    for G in [diagram] + diagrams:
+        assertMatchesBruteForce(G, G.nodes)
+
+    # limit is the third argument
+    assert len(ImpliedIndependencies.listImpliedIndependencies(diagram, None, 2)) == 2
+
+
+def testLatentNodesAreNotObserved():
+    G = parseGraph('''
+<NODES>
+W
+X
+U latent
+Y
+
+<EDGES>
+W -> X
+X -> U
+U -> Y
+''')
+
+    # X and Y are only separated by U, which cannot be measured
+    assertMatchesBruteForce(G, list(filter(lambda n: n['type_'] != 'latent', G.nodes)))
+    assert len(ImpliedIndependencies.listImpliedIndependencies(G)) == 1
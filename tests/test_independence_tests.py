@@ -0,0 +1,91 @@
+import math
+import numpy as np
+import pandas as pd
+
+from src.fusion import parseGraph
+from src.path_analysis.independence_tests import IndependenceTests
+
+
+# DataFrame, str, str, str[], str
+# Dict[str, number]
+def crosstabTest(data, x, y, Z, test):
+    # the statistic summed over a crosstab of every stratum of Z, as it is usually computed
+    data = data.dropna(subset = [x, y] + list(Z))
+    strata = [data] if len(Z) == 0 else list(map(lambda group: group[1], data.groupby(list(Z))))
+    statistic = 0
+    dof = 0
+
+    for stratum in strata:
+        n = pd.crosstab(stratum[x], stratum[y]).to_numpy(dtype = np.float64)
+        expected = n.sum(axis = 1)[:, None] * n.sum(axis = 0)[None, :] / n.sum()
+
+        if test == IndependenceTests.gTest:
+            statistic = statistic + 2 * np.where(n > 0, n * np.log(np.where(n > 0, n, 1) / expected), 0).sum()
+        else:
+            statistic = statistic + ((n - expected) ** 2 / expected).sum()
+
+        dof = dof + (n.shape[0] - 1) * (n.shape[1] - 1)
+
+    return {'statistic': statistic, 'dof': dof, 'n': len(data)}
+
+
+def randomData(rng, rows):
+    # A -> B -> C with D independent of everything, and some values missing
+    a = rng.integers(0, 3, rows)
+    b = (a + rng.integers(0, 2, rows)) % 3
+    c = np.where(rng.random(rows) < 0.7, b, rng.integers(0, 3, rows))
+    data = pd.DataFrame({'A': a, 'B': b, 'C': c, 'D': rng.integers(0, 4, rows)}).astype(float)
+    data[rng.random((rows, 4)) < 0.03] = np.nan
+
+    return data
+
+
+def testStatisticsMatchCrosstabs():
+    rng = np.random.default_rng(20)
+    data = randomData(rng, 500)
+    statements = [('A', 'C', ()), ('A', 'C', ('B',)), ('A', 'D', ('B', 'C')), ('D', 'B', ())]
+    table = IndependenceTests.contingencyTable(data, ['A', 'B', 'C', 'D'])
+
+    for test in (IndependenceTests.chiSquare, IndependenceTests.gTest):
+        for (x, y, Z) in statements:
+            result = IndependenceTests.testIndependence(table, x, y, Z, test)
+            expected = crosstabTest(data, x, y, Z, test)
+
+            assert math.isclose(result['statistic'], expected['statistic'], rel_tol = 1e-9)
+            assert (result['dof'], result['n']) == (expected['dof'], expected['n'])
+
+
+def testSurvivalMatchesClosedForm():
+    # for an even number of degrees of freedom, Q(k, x) = exp(-x) sum_{i < k} x^i / i! with k = dof / 2, x = statistic / 2
+    for dof in (2, 4, 10, 40):
+        for statistic in (0.5, 3.0, 12.0, 60.0, 200.0):
+            k = dof // 2
+            x = statistic / 2
+            expected = math.exp(-x) * sum(map(lambda i: x ** i / math.factorial(i), range(k)))
+
+            assert math.isclose(IndependenceTests.chiSquareSurvival(statistic, dof), expected, rel_tol = 1e-9, abs_tol = 1e-300)
+
+
+def testImpliedIndependenciesOfTheData():
+    G = parseGraph('''
+<NODES>
+A
+B
+C
+D
+U latent
+
+<EDGES>
+A -> B
+B -> C
+U -> D
+''')
+    data = randomData(np.random.default_rng(21), 400)
+    # a column for the latent node, and one for no node at all, are not tested
+    data['U'] = data['D']
+    data['E'] = data['A']
+
+    results = IndependenceTests.testImpliedIndependencies(G, data)
+
+    assert list(map(lambda r: (r[0], r[1], r[2]), results[['X', 'Y', 'Z']].itertuples(index = False))) == [('A', 'C', ('B',)), ('A', 'D', ()), ('B', 'D', ()), ('C', 'D', ())]
+    assert results.equals(IndependenceTests.testImpliedIndependencies(G, data, processes = 2))
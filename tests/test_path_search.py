@@ -0,0 +1,206 @@
+import json
+import random
+import pytest
+import networkx as nx
+
+from src.graph.classes.graph import Graph
+from src.path_analysis.d_separation import DSeparation
+from src.path_analysis.classes.path import Path
+from src.path_analysis.classes.path_edge import PathEdge
+from src.path_analysis.classes.path_search import PathSearch
+from src.path_analysis.classes.direction import Direction as PathDirection
+
+
+kinds = ('DConnected', 'DSeparated', 'DConnectedDirected')
+
+
+# Path
+# tuple
+def pathTuple(path):
+    return tuple(map(lambda e: (e.edge['from_'], e.edge['to_'], e.edge['type_'], e.direction.name), path.edges))
+
+
+# Graph, Node[], Node[], Node[], str
+# tuple[]
+def bruteForcePaths(G, X, Y, Z, kind):
+    # every simple path from X to Y (not going through Y) listed by networkx, then checked on its own
+    observed = DSeparation.getObservedVariables(G, Z)
+    isKept = {
+        'DConnected': DSeparation.filterDConnectedPaths,
+        'DSeparated': DSeparation.filterDSeparatedPaths,
+        'DConnectedDirected': DSeparation.filterDConnectedDirectedPaths
+    }[kind]
+    targets = dict.fromkeys(map(lambda n: n['name'], Y), True)
+    edges = G.edges
+    skeleton = nx.MultiGraph()
+
+    skeleton.add_nodes_from(G.nx.nodes)
+    skeleton.add_edges_from(map(lambda item: (item[1]['from_'], item[1]['to_'], item[0]), enumerate(edges)))
+
+    paths = []
+
+    for x in X:
+        for y in Y:
+            for steps in nx.all_simple_edge_paths(skeleton, x['name'], y['name']):
+                if any(map(lambda step: step[1] in targets, steps[:-1])):
+                    continue
+
+                path = Path(list(map(lambda step: PathEdge(edges[step[2]], PathDirection.directed if edges[step[2]]['from_'] == step[0] else PathDirection.reversed), steps)))
+
+                if isKept(path, observed['observed'], observed['ancestors']):
+                    paths.append(pathTuple(path))
+
+    return sorted(paths)
+
+
+@pytest.fixture
+def queries(diagram, diagrams):
+    # (G, X, Y, Z) on every diagram, with X and Y not empty
+    rng = random.Random(11)
+    queries = []
+
+    for G in [diagram] + diagrams:
+        for i in range(3):
+            nodes = rng.sample(G.nodes, len(G.nodes))
+            x = rng.randint(1, 2)
+            z = rng.randint(0, min(2, len(nodes) - x - 1))
+
+            queries.append((G, nodes[:x], nodes[x:x + 1], nodes[x + 1:x + 1 + z]))
+
+    return queries
+
+
+def testIterPathsMatchesBruteForce(queries):
+    for (G, X, Y, Z) in queries:
+        for kind in kinds:
+            paths = list(map(pathTuple, getattr(DSeparation, 'iter' + kind + 'Paths')(G, X, Y, Z)))
+
+            assert list(map(pathTuple, getattr(DSeparation, 'find' + kind + 'Paths')(G, X, Y, Z))) == paths
+            assert sorted(paths) == bruteForcePaths(G, X, Y, Z, kind)
+
+
+def testCursorsResumeAfterTheirPath(queries):
+    for (G, X, Y, Z) in queries:
+        for kind in kinds:
+            iterPaths = getattr(DSeparation, 'iter' + kind + 'Paths')
+            paths = list(iterPaths(G, X, Y, Z))
+
+            for (k, path) in enumerate(paths):
+                # cursors are plain records that survive a round trip through JSON
+                cursor = json.loads(json.dumps(PathSearch.toCursor(path)))
+
+                assert list(map(pathTuple, iterPaths(G, X, Y, Z, cursor))) == list(map(pathTuple, paths[k + 1:]))
+                assert list(map(pathTuple, iterPaths(G, X, Y, Z, path))) == list(map(pathTuple, paths[k + 1:]))
+
+
+def testCachedIncidentEdgesMatchTheFilter(queries):
+    for (G, X, Y, Z) in queries:
+        for type_ in ('d-con', 'd-sep'):
+            cached = DSeparation.getPathSearch(G, X, Y, Z, type_)
+            # a filter the search cannot tell the state of is called again at every step
+            uncached = DSeparation.getPathSearch(G, X, Y, Z, type_)
+            edgeFilter = uncached.edgeFilter
+            uncached.edgeFilter = lambda graph, node, previous: edgeFilter(graph, node, previous)
+            uncached.edgeFilterState = None
+
+            assert list(map(pathTuple, cached.iterPaths())) == list(map(pathTuple, uncached.iterPaths()))
+
+
+def testCompactPathsMatchPaths(queries):
+    for (G, X, Y, Z) in queries:
+        for kind in kinds:
+            iterPaths = getattr(DSeparation, 'iter' + kind + 'Paths')
+            paths = list(iterPaths(G, X, Y, Z))
+            compactPaths = list(iterPaths(G, X, Y, Z, compact = True))
+
+            assert list(map(lambda path: pathTuple(path.toPath()), compactPaths)) == list(map(pathTuple, paths))
+            assert list(map(lambda path: path.blockedBy, compactPaths)) == list(map(lambda path: path.blockedBy, paths))
+
+            if len(compactPaths) > 1:
+                # all the paths of a search share their edge table
+                assert compactPaths[0].table is compactPaths[-1].table
+                assert list(map(pathTuple, iterPaths(G, X, Y, Z, compactPaths[0]))) == list(map(pathTuple, paths[1:]))
+
+
+def testPoolMatchesSequentialSearch(queries):
+    # every part of the search goes through a pool, so a few queries are enough
+    for (G, X, Y, Z) in queries[:12]:
+        for kind in kinds:
+            iterPaths = getattr(DSeparation, 'iter' + kind + 'Paths')
+            paths = list(map(pathTuple, iterPaths(G, X, Y, Z)))
+
+            assert list(map(pathTuple, getattr(DSeparation, 'find' + kind + 'Paths')(G, X, Y, Z, processes = 2))) == paths
+            assert list(map(lambda path: pathTuple(path.toPath()), iterPaths(G, X, Y, Z, compact = True, processes = 2))) == paths
+
+            if len(paths) > 2:
+                cursor = PathSearch.toCursor(next(iterPaths(G, X, Y, Z)))
+
+                assert list(map(pathTuple, iterPaths(G, X, Y, Z, cursor, processes = 2))) == paths[1:]
+
+
+def testDSeparatedSearchMatchesFilteredPaths(queries):
+    for (G, X, Y, Z) in queries:
+        observed = DSeparation.getObservedVariables(G, Z)
+        # every path, kept or not by filterDSeparatedPaths once found, as the search used to do
+        search = PathSearch(G, X, Y)
+        search.pathFilter = lambda path: DSeparation.filterDSeparatedPaths(path, observed['observed'], observed['ancestors'])
+        filtered = list(search.iterPaths())
+        paths = DSeparation.findDSeparatedPaths(G, X, Y, Z)
+
+        assert list(map(pathTuple, paths)) == list(map(pathTuple, filtered))
+
+        for path in paths:
+            blockers = map(lambda i: DSeparation.blockingNode(path.edges[i - 1], path.edges[i], observed['observed'], observed['ancestors']), range(1, path.length))
+
+            assert path.blockedBy == next(filter(lambda blocker: blocker is not None, blockers))
+
+
+def testBoundedAndShortestFirstSearchesMatchDepthFirst(queries):
+    for (G, X, Y, Z) in queries:
+        for kind in kinds:
+            findPaths = getattr(DSeparation, 'find' + kind + 'Paths')
+            iterPaths = getattr(DSeparation, 'iter' + kind + 'Paths')
+            paths = list(map(pathTuple, findPaths(G, X, Y, Z)))
+            # the shortest first, and in depth-first order among paths of the same length
+            shortest = sorted(paths, key = len)
+
+            assert list(map(pathTuple, findPaths(G, X, Y, Z, maxLength = 2))) == list(filter(lambda path: len(path) <= 2, paths))
+            assert list(map(pathTuple, findPaths(G, X, Y, Z, order = PathSearch.shortestFirst))) == shortest
+            assert list(map(pathTuple, findPaths(G, X, Y, Z, maxLength = 2, order = PathSearch.shortestFirst))) == list(filter(lambda path: len(path) <= 2, shortest))
+
+            if len(shortest) > 1:
+                first = next(iterPaths(G, X, Y, Z, order = PathSearch.shortestFirst))
+
+                assert list(map(pathTuple, iterPaths(G, X, Y, Z, PathSearch.toCursor(first), order = PathSearch.shortestFirst))) == shortest[1:]
+
+
+def testCountsMatchFoundPaths(queries):
+    for (G, X, Y, Z) in queries:
+        for kind in ('DConnected', 'DSeparated'):
+            paths = getattr(DSeparation, 'find' + kind + 'Paths')(G, X, Y, Z)
+            countPaths = getattr(DSeparation, 'count' + kind + 'Paths')
+            nodes = dict()
+
+            for path in paths:
+                for edge in path.edges[1:]:
+                    nodes[edge.source] = nodes.get(edge.source, 0) + 1
+
+            assert countPaths(G, X, Y, Z, byNode = True) == {'count': len(paths), 'exact': True, 'nodes': nodes}
+            assert countPaths(G, X, Y, Z, maxLength = 2)['count'] == len(list(filter(lambda path: path.length <= 2, paths)))
+            # a budget of as many paths as there are is enough for an exact count
+            assert countPaths(G, X, Y, Z, budget = len(paths))['exact']
+
+            if len(paths) > 0:
+                assert not countPaths(G, X, Y, Z, budget = len(paths) - 1)['exact']
+
+
+def testEstimateIsCloseToTheCount():
+    names = ['V' + str(i) for i in range(8)]
+    G = Graph(nodes = list(map(lambda name: {'name': name}, names)), edges = [{'from_': names[i], 'to_': names[j]} for i in range(8) for j in range(i + 1, 8)])
+    X = G.nodes[:1]
+    Y = G.nodes[-1:]
+    count = len(DSeparation.findDConnectedPaths(G, X, Y, []))
+    estimate = DSeparation.getPathSearch(G, X, Y, []).estimatePaths(4000)
+
+    assert abs(estimate['count'] - count) < 0.1 * count
+    assert DSeparation.countDConnectedPaths(G, X, Y, [], budget = 10)['count'] >= 10
@@ -0,0 +1,30 @@
+import random
+
+from src.graph.classes.graph import Graph
+from src.adjustment.adjustment_sets_utils import FindSep, TestSep
+from src.adjustment.classes.separation_oracle import SeparationOracle
+from src.inference.utils.graph_utils import GraphUtils as gu
+
+
+def testOracleMatchesFindSep(diagram, diagrams):
+    rng = random.Random(25)
+
+    for G in [diagram] + diagrams:
+        # FindSep and TestSep only follow directed edges
+        G = Graph(nodes = G.nodes, edges = list(filter(lambda e: e['type_'] == 'directed', G.edges)))
+        nodes = G.nodes
+        X = nodes[:1]
+        # the ST enumerator asks its oracle about a transformed view of the graph
+        for H in (G, gu.transform(G, X, None)):
+            oracle = SeparationOracle(H)
+
+            for i in range(20):
+                Y = [rng.choice(nodes[1:])]
+                others = list(filter(lambda n: n['name'] != X[0]['name'] and n['name'] != Y[0]['name'], nodes))
+                R = rng.sample(others, rng.randint(0, len(others)))
+                I = rng.sample(R, rng.randint(0, len(R)))
+
+                assert oracle.existsSep(X, Y, I, R) == (FindSep(H, X, Y, I, R) is not None)
+                assert oracle.test(X, Y, I) == TestSep(H, X, Y, I)
+                # asked again, the answers come from the memo
+                assert oracle.existsSep(X, Y, I, R) == (FindSep(H, X, Y, I, R) is not None)